@@ -1,6 +1,10 @@
 
 # --- Day 1: Trebuchet?! ---
 
+import os
+
+import numpy as np
+
 # Dictionary mapping word representations of numbers to their numeric values
 num_words_to_digits = {
     'one': 1, 'two': 2, 'three': 3, 'four': 4,
@@ -8,53 +12,229 @@ num_words_to_digits = {
     'nine': 9,
 }
 
+# Dictionary mapping plain digit characters to their numeric values
+digits_to_numbers = {str(digit): digit for digit in range(10)}
+
 
-def convert_line_to_numbers(line, enable_word_conversion):
+class NumberAutomaton:
+    """
+    Aho-Corasick automaton over digits and number words, compiled into a full
+    transition table so that every character costs a single dictionary lookup.
     """
-    Converts a line of text to a list of numbers. This function looks for digits
-    and word representations of numbers in the text, converting them to integers.
 
-    :param line: A string containing the text to be processed.
-    :param enable_word_conversion: A boolean that enables conversion of words to numbers.
-    :return: A list of integers found in the line.
+    def __init__(self, patterns):
+        """
+        Builds the trie, the failure links and the completed transition table.
+
+        :param patterns: Dictionary mapping each pattern string to its numeric value.
+        """
+        self.transitions = [{}]
+        self.outputs = [None]
+        self.is_digit = [False]
+
+        # Build the trie of all patterns
+        for pattern, value in patterns.items():
+            state = 0
+            for char in pattern:
+                if char not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.outputs.append(None)
+                    self.is_digit.append(False)
+                    self.transitions[state][char] = len(self.transitions) - 1
+                state = self.transitions[state][char]
+            self.outputs[state] = value
+            self.is_digit[state] = pattern.isdigit()
+
+        # Breadth-first pass: compute failure links and fill in missing transitions,
+        # so that the scan never has to follow a failure chain at run time
+        fail = [0] * len(self.transitions)
+        queue = list(self.transitions[0].values())
+        for state in queue:
+            for char, target in self.transitions[state].items():
+                queue.append(target)
+                fallback = fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = fail[fallback]
+                link = self.transitions[fallback].get(char, 0)
+                fail[target] = link if link != target else 0
+                if self.outputs[target] is None:
+                    self.outputs[target] = self.outputs[fail[target]]
+                    self.is_digit[target] = self.is_digit[fail[target]]
+            for char, target in self.transitions[fail[state]].items():
+                self.transitions[state].setdefault(char, target)
+
+    def scan(self, chars):
+        """
+        Scans the characters until both the first digit and the first number
+        (digit or word) have been matched.
+
+        :param chars: Iterable of characters to scan.
+        :return: Tuple of the first digit and the first number, None where absent.
+        """
+        transitions, outputs, is_digit = self.transitions, self.outputs, self.is_digit
+        first_digit = first_number = None
+        state = 0
+
+        for char in chars:
+            state = transitions[state].get(char, 0)
+            value = outputs[state]
+            if value is None:
+                continue
+            if first_number is None:
+                first_number = value
+            if is_digit[state]:
+                first_digit = value
+                break  # A digit is always matched after (or as) the first number
+
+        return first_digit, first_number
+
+
+# Forward automaton finds the first match, the reversed one finds the last match
+forward_automaton = NumberAutomaton({**digits_to_numbers, **num_words_to_digits})
+backward_automaton = NumberAutomaton({
+    **digits_to_numbers,
+    **{word[::-1]: value for word, value in num_words_to_digits.items()},
+})
+
+
+def find_first_and_last(line):
     """
-    numbers = []
-    word = ''
+    Finds the first and last number of a line for both parts at once. The line is
+    scanned forward until the first match and backward from its end until the last
+    match, so overlapping words such as 'twone' are handled correctly.
 
-    for char in line:
-        if char.isdigit():
-            # Add the digit to the numbers list
-            numbers.append(int(char))
-        elif char.isalpha():
-            # Build the word, and if it forms a valid number word, convert it
-            word += char
-            if word in num_words_to_digits and enable_word_conversion:
-                numbers.append(num_words_to_digits[word])
-                word = ''  # Reset word for next potential number word
+    :param line: A string containing the text to be processed.
+    :return: Tuple of (first, last) digit pairs for part 1 and part 2, None where absent.
+    """
+    first_digit, first_number = forward_automaton.scan(line)
+    if first_number is None:
+        return None, None
 
-    return numbers
+    last_digit, last_number = backward_automaton.scan(reversed(line))
+    basic = (first_digit, last_digit) if first_digit is not None else None
+    return basic, (first_number, last_number)
 
 
-def read_file_and_convert(file_path, convert_words=False):
+def read_file_and_convert(file_path):
     """
-    Reads a file line by line and converts each line to a list of numbers
-    based on the convert_line_to_numbers function.
+    Reads a file line by line and extracts the first and last number from each line,
+    producing the data for both parts in a single pass over the file.
 
     :param file_path: Path of the file to read.
-    :param convert_words: Whether to convert number words to digits.
-    :return: A list of tuples, each containing the first and last number from each line.
+    :return: Tuple of two lists of (first, last) tuples, without and with word conversion.
     """
-    result = []
+    result_basic, result_advanced = [], []
 
     with open(file_path, 'r') as file:
         for line in file:
-            # Convert each line to a list of numbers
-            num_list = convert_line_to_numbers(line, convert_words)
-            # Append a tuple of the first and last number in the list, if available
-            if num_list:
-                result.append((num_list[0], num_list[-1]))
+            basic, advanced = find_first_and_last(line)
+            if basic:
+                result_basic.append(basic)
+            if advanced:
+                result_advanced.append(advanced)
+
+    return result_basic, result_advanced
+
+
+# Codes of the vectorized engine: 1 + the number starting at a byte, NEWLINE_CODE for a line break
+NEWLINE_CODE = 11
+byte_codes = np.zeros(256, dtype=np.uint8)
+byte_codes[ord('0'):ord('9') + 1] = np.arange(1, 11)
+byte_codes[ord('\n')] = NEWLINE_CODE
+
+# Index + 1 of the number word starting with each pair of bytes, read as a little-endian uint16
+word_bigrams = np.zeros(1 << 16, dtype=np.uint8)
+for word_index, number_word in enumerate(num_words_to_digits):
+    word_bigrams[ord(number_word[0]) | ord(number_word[1]) << 8] = word_index + 1
+
+
+def _sum_first_and_last(codes):
+    """
+    Sums first * 10 + last over all lines of a chunk, using only array operations. The
+    coded bytes are reduced to the sorted list of matches and line breaks; the first match
+    of a line is the one after a line break, the last one the one before a line break.
+
+    :param codes: Uint8 array of byte codes, 0 where nothing matches.
+    :return: The calibration sum of the chunk.
+    """
+    events = codes[np.flatnonzero(codes)]
+    is_newline = events == NEWLINE_CODE
+    # Line breaks are assumed before the first and after the last event of the chunk
+    padded = np.ones(events.size + 2, dtype=bool)
+    padded[1:-1] = is_newline
+
+    first = padded[:-2] > is_newline
+    last = padded[2:] > is_newline
+    # Codes are value + 1, hence the correction by the number of lines with matches
+    return (10 * (int(events[first].sum(dtype=np.int64)) - int(first.sum()))
+            + int(events[last].sum(dtype=np.int64)) - int(last.sum()))
+
+
+def _mark_number_words(chunk, codes):
+    """
+    Marks the start of every (possibly overlapping) number word in the byte codes.
+    Candidates are found from their first two bytes with one table lookup over uint16
+    views at even and odd offsets, then the remaining bytes are checked on candidates only.
+
+    :param chunk: Uint8 array of the bytes of the chunk.
+    :param codes: Uint8 array of byte codes, updated in place.
+    """
+    words = list(num_words_to_digits.items())
+    for offset in (0, 1):
+        pairs = (chunk.size - offset) // 2 * 2
+        hits = word_bigrams[chunk[offset:offset + pairs].view('<u2')]
+        candidates = np.flatnonzero(hits)
+        word_indices = hits[candidates]
+        candidates = candidates * 2 + offset
+
+        for word_index, (word, value) in enumerate(words, start=1):
+            matches = candidates[word_indices == word_index]
+            matches = matches[matches + len(word) <= chunk.size]
+            for position, char in enumerate(word[2:], start=2):
+                matches = matches[chunk[matches + position] == ord(char)]
+            codes[matches] = value + 1
+
+
+def compute_sums_vectorized(file_path, chunk_size=1 << 22):
+    """
+    Computes both part sums from a single read of a memory-mapped file, without any
+    per-character Python loop. The file is processed in chunks cut at line boundaries,
+    so temporary memory stays proportional to chunk_size.
+
+    :param file_path: Path of the file to read.
+    :param chunk_size: Approximate number of bytes processed per chunk.
+    :return: Tuple of the part 1 and part 2 sums.
+    """
+    if not os.path.getsize(file_path):
+        return 0, 0
+
+    buffer = np.memmap(file_path, dtype=np.uint8, mode='r')
+    total_basic = total_advanced = 0
+    start = 0
+
+    while start < buffer.size:
+        end = min(start + chunk_size, buffer.size)
+        chunk = buffer[start:end]
+        if end < buffer.size:
+            last_newline = chunk.size - 1 - int(np.argmax(chunk[::-1] == ord('\n')))
+            if chunk[last_newline] != ord('\n'):
+                # A single line longer than the chunk, retry with a larger one
+                chunk_size *= 2
+                continue
+            # Cut the chunk after its last complete line
+            chunk = chunk[:last_newline + 1]
+
+        # Part 1: digits only
+        codes = byte_codes[chunk]
+        total_basic += _sum_first_and_last(codes)
+
+        # Part 2: additionally the number words
+        _mark_number_words(chunk, codes)
+        total_advanced += _sum_first_and_last(codes)
+
+        start += chunk.size
 
-    return result
+    return total_basic, total_advanced
 
 
 def compute_sum(data_list):
@@ -70,9 +250,8 @@ def compute_sum(data_list):
 
 # Main function
 if __name__ == '__main__':
-    # Process the file without and with converting word representations
-    input_data_basic = read_file_and_convert('puzzle_input')
-    input_data_advanced = read_file_and_convert('puzzle_input', True)
+    # Process the file once, without and with converting word representations
+    input_data_basic, input_data_advanced = read_file_and_convert('puzzle_input')
 
     # Print the results of the computations
     print(f'Part 1: {compute_sum(input_data_basic)}')
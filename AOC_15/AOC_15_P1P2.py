@@ -1,113 +1,334 @@
-from functools import reduce
+from collections import defaultdict, namedtuple
+from functools import lru_cache
 
+import numpy as np
 
-def read_first_line_from_file(file_name):
+# HASH_TABLE[state][byte] is the HASH state after feeding byte in the given state
+HASH_TABLE = tuple(bytes((state + byte) * 17 % 256 for byte in range(256)) for state in range(256))
+
+HASH_ARRAY = np.frombuffer(b''.join(HASH_TABLE), dtype=np.uint8).reshape(256, 256)
+
+LABEL_CACHE_SIZE = 4096  # Number of distinct labels whose box is remembered
+
+# A step of the initialization sequence, hashed once for both parts; focal_length is None for '-'
+Token = namedtuple('Token', ['label', 'focal_length', 'step_hash', 'box'])
+
+
+def read_step_chunks(file_name, chunk_size=1 << 20):
     """
-    Reads and returns the first line from the given file.
+    Reads the comma-separated steps of the first line in chunks, without holding the
+    whole line in memory. A step cut by a chunk boundary is carried over to the next chunk.
 
     :param file_name: Path to the file to be read.
-    :return: The first line of the file as a string.
+    :param chunk_size: Number of bytes read at once.
+    :return: Generator of lists of steps as bytes.
+    """
+    remainder = b''
+    with open(file_name, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            line_end = chunk.find(b'\n')
+            if line_end >= 0:
+                chunk = chunk[:line_end]
+            steps = (remainder + chunk).split(b',')
+
+            if not chunk or line_end >= 0:
+                # End of the line, the last step is complete as well
+                steps = [step.strip() for step in steps]
+                steps = [step for step in steps if step]
+                if steps:
+                    yield steps
+                return
+
+            remainder = steps.pop()
+            if steps:
+                yield steps
+
+
+def continue_hash(state, data):
+    """
+    Feeds bytes into the HASH algorithm, starting from the given state.
+
+    :param state: HASH state to start from.
+    :param data: Bytes to be hashed.
+    :return: The resulting HASH state.
     """
-    with open(file_name, 'r') as f:
-        return f.readline().strip()
+    for byte in data:
+        state = HASH_TABLE[state][byte]
+    return state
 
 
-def split_line_into_sequences(line):
+def batch_tokenize(steps):
     """
-    Splits a line into sequences separated by commas.
+    Tokenizes a chunk of steps, hashing all of them at once. Steps of equal length are
+    stacked into a byte matrix and hashed column by column through the transition table;
+    the state reached at the end of each label is its box. This is the only hashing the
+    steps go through, both parts then use the resulting tokens.
 
-    :param line: A string representing a line from the file.
-    :return: List of sequences.
+    :param steps: List of steps as bytes.
+    :return: List of tokens, in the order of the steps.
     """
-    return line.split(',')
+    labels, focal_lengths, label_lengths = [], [], []
+    groups = defaultdict(list)
+    for index, step in enumerate(steps):
+        label, operator, value = step.partition(b'=')
+        if not operator:
+            label = step[:-1]
+        labels.append(label.decode())
+        focal_lengths.append(int(value) if value else None)
+        label_lengths.append(len(label))
+        groups[len(step)].append(index)
+
+    step_hashes = np.zeros(len(steps), dtype=np.uint8)
+    boxes = np.zeros(len(steps), dtype=np.uint8)
+    label_lengths = np.array(label_lengths, dtype=np.intp)
+    for length, indices in groups.items():
+        matrix = np.frombuffer(b''.join(steps[index] for index in indices), dtype=np.uint8).reshape(-1, length)
+        ends = label_lengths[indices]
+        state = box = np.zeros(len(indices), dtype=np.uint8)
+        for column in range(length):
+            box = np.where(ends == column, state, box)
+            state = HASH_ARRAY[state, matrix[:, column]]
+        step_hashes[indices] = state
+        boxes[indices] = box
+
+    return list(map(Token, labels, focal_lengths, step_hashes.tolist(), boxes.tolist()))
 
 
 def calculate_hash(sequence):
     """
     Calculates a custom hash value for a given sequence.
 
-    :param sequence: The sequence for which the hash is to be calculated.
+    :param sequence: The sequence for which the hash is to be calculated, as str or bytes.
     :return: Hash value for the sequence.
     """
-    return reduce(lambda v, ch: (v + ord(ch)) * 17 % 256, sequence, 0)
+    return continue_hash(0, sequence.encode() if isinstance(sequence, str) else sequence)
 
 
-def sum_of_hashes(sequences):
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
+def label_box(label):
     """
-    Calculates the sum of hash values for each sequence in the list.
+    Calculates the box of a label, remembering recently used labels.
 
-    :param sequences: List of sequences to be hashed.
-    :return: Sum of hash values.
+    :param label: The lens label.
+    :return: Box number of the label.
     """
-    return sum(calculate_hash(sequence) for sequence in sequences)
+    return calculate_hash(label)
 
 
-def calculate_power(sequences):
+def tokenize(sequence):
     """
-    Calculates the power based on the given sequences.
+    Splits a step into its parts and hashes it. The hash of the whole step continues
+    from the cached hash of its label, so the label is hashed at most once.
 
-    :param sequences: List of sequences representing box names and values.
-    :return: Total power calculated from the box values.
+    :param sequence: A sequence from the list.
+    :return: Token of the step.
     """
-    boxes = [{} for _ in range(256)]
+    label, operator, value = sequence.partition('=')
+    if not operator:
+        label, operator = sequence[:-1], '-'
+    box = label_box(label)
+    step_hash = continue_hash(box, (operator + value).encode())
+    return Token(label, int(value) if value else None, step_hash, box)
 
-    for sequence in sequences:
-        handle_sequence(sequence, boxes)
 
-    return calculate_total_power(boxes)
+def tokenize_sequences(sequences):
+    """
+    Tokenizes all steps of the initialization sequence.
+
+    :param sequences: List of sequences.
+    :return: List of tokens.
+    """
+    return [tokenize(sequence) for sequence in sequences]
 
 
-def handle_sequence(sequence, boxes):
+def sum_of_hashes(tokens):
     """
-    Handles a single sequence and updates boxes accordingly.
+    Calculates the sum of hash values for each step.
 
-    :param sequence: A sequence from the list.
-    :param boxes: List of dictionaries representing the boxes.
+    :param tokens: List of tokens of the steps.
+    :return: Sum of hash values.
     """
-    if sequence.endswith('-'):
-        remove_from_box(sequence, boxes)
-    else:
-        add_to_box(sequence, boxes)
+    return sum(token.step_hash for token in tokens)
 
 
-def remove_from_box(sequence, boxes):
+class FenwickTree:
+    """
+    Binary indexed tree over positions 1, 2, ... that can grow by appending new positions.
     """
-    Removes a name from the corresponding box based on the sequence.
 
-    :param sequence: A sequence indicating a name to be removed.
-    :param boxes: List of dictionaries representing the boxes.
+    def __init__(self):
+        """
+        Creates an empty tree.
+        """
+        self.tree = [0]
+
+    def prefix_sum(self, position):
+        """
+        Sums the values of positions 1 to position in O(log n).
+
+        :param position: Last position included in the sum.
+        :return: The sum.
+        """
+        total = 0
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+        return total
+
+    def add(self, position, delta):
+        """
+        Adds a delta to the value at a position in O(log n).
+
+        :param position: Position to update.
+        :param delta: Value to add.
+        """
+        while position < len(self.tree):
+            self.tree[position] += delta
+            position += position & -position
+
+    def append(self, value):
+        """
+        Appends a new position with the given value in O(log n).
+
+        :param value: Value of the new position.
+        :return: The new position.
+        """
+        position = len(self.tree)
+        # The new node covers the positions after position - lowbit(position), itself included
+        self.tree.append(value + self.prefix_sum(position - 1) - self.prefix_sum(position - (position & -position)))
+        return position
+
+
+class LensBox:
+    """
+    A box of lenses in insertion order. Lenses keep the position at which they were
+    inserted, and Fenwick trees over these positions count the lenses and sum their
+    focal lengths, so the slot of any lens and the focal lengths behind it are found
+    in O(log n) without shifting later lenses on removal.
     """
-    name = sequence[:-1]
-    boxes[calculate_hash(name)].pop(name, None)
 
+    def __init__(self):
+        """
+        Creates an empty box.
+        """
+        self.lenses = {}  # Label to (position, focal length)
+        self.counts = FenwickTree()
+        self.focal_sums = FenwickTree()
+        self.power = 0  # Sum of slot times focal length over the lenses of the box
+
+    def add(self, label, focal_length):
+        """
+        Adds a lens at the back of the box, or replaces the focal length of an existing lens.
+
+        :param label: Label of the lens.
+        :param focal_length: Focal length of the lens.
+        """
+        if label in self.lenses:
+            position, previous = self.lenses[label]
+            self.power += self.counts.prefix_sum(position) * (focal_length - previous)
+            self.focal_sums.add(position, focal_length - previous)
+        else:
+            position = self.counts.append(1)
+            self.focal_sums.append(focal_length)
+            self.power += (len(self.lenses) + 1) * focal_length
+        self.lenses[label] = position, focal_length
+
+    def remove(self, label):
+        """
+        Removes a lens if present; every lens behind it moves forward one slot.
+
+        :param label: Label of the lens.
+        """
+        if label not in self.lenses:
+            return
+        position, focal_length = self.lenses.pop(label)
+        slot = self.counts.prefix_sum(position)
+        behind = self.focal_sums.prefix_sum(len(self.focal_sums.tree) - 1) - self.focal_sums.prefix_sum(position)
+        self.power -= slot * focal_length + behind
+
+        if self.lenses:
+            self.counts.add(position, -1)
+            self.focal_sums.add(position, -focal_length)
+        else:
+            # An empty box starts over, so the trees only grow while lenses stay in it
+            self.counts, self.focal_sums = FenwickTree(), FenwickTree()
+
+
+class LensLibrary:
+    """
+    The 256 boxes of the HASHMAP together with their total focusing power, which is
+    updated with every step and can be read at any time.
+    """
 
-def add_to_box(sequence, boxes):
+    def __init__(self):
+        """
+        Creates the library with all boxes empty.
+        """
+        self.boxes = [LensBox() for _ in range(256)]
+        self.total_power = 0
+
+    def handle_sequence(self, token):
+        """
+        Handles a single step and updates the boxes and the total power accordingly.
+
+        :param token: Token of a step from the list.
+        """
+        box = self.boxes[token.box]
+        power = box.power
+        if token.focal_length is None:
+            box.remove(token.label)
+        else:
+            box.add(token.label, token.focal_length)
+        self.total_power += (token.box + 1) * (box.power - power)
+
+
+def power_after_each_step(tokens):
     """
-    Adds a value to a box based on the sequence.
+    Replays the steps and reports the focusing power after each of them.
 
-    :param sequence: A sequence indicating a name and value to be added.
-    :param boxes: List of dictionaries representing the boxes.
+    :param tokens: Iterable of tokens representing box names and values.
+    :return: Generator of the total power after every step.
     """
-    name, value = sequence.split('=')
-    boxes[calculate_hash(name)][name] = int(value)
+    library = LensLibrary()
+    for token in tokens:
+        library.handle_sequence(token)
+        yield library.total_power
 
 
-def calculate_total_power(boxes):
+def calculate_power(tokens):
     """
-    Calculates the total power based on the box values.
+    Calculates the power based on the given steps.
 
-    :param boxes: List of dictionaries representing the boxes.
-    :return: Total power.
+    :param tokens: List of tokens representing box names and values.
+    :return: Total power calculated from the box values.
     """
     power = 0
-    for bid, box in enumerate(boxes, start=1):
-        power += sum(bid * sid * value for sid, value in enumerate(box.values(), start=1))
+    for power in power_after_each_step(tokens):
+        pass
     return power
 
 
+def solve_stream(file_name, chunk_size=1 << 20):
+    """
+    Computes both parts in a single streaming pass over the initialization sequence:
+    every chunk of steps is tokenized as a batch, then summed for part 1 and replayed for part 2.
+
+    :param file_name: Path to the file to be read.
+    :param chunk_size: Number of bytes read at once.
+    :return: Tuple of the sum of hashes and the total focusing power.
+    """
+    hash_sum, library = 0, LensLibrary()
+    for steps in read_step_chunks(file_name, chunk_size):
+        tokens = batch_tokenize(steps)
+        hash_sum += sum_of_hashes(tokens)
+        for token in tokens:
+            library.handle_sequence(token)
+    return hash_sum, library.total_power
+
+
 if __name__ == '__main__':
-    line = read_first_line_from_file('puzzle_input')
-    sequences = split_line_into_sequences(line)
+    part_1, part_2 = solve_stream('puzzle_input')
 
-    print(f'Part 1: {sum_of_hashes(sequences)}')
-    print(f'Part 2: {calculate_power(sequences)}')
+    print(f'Part 1: {part_1}')
+    print(f'Part 2: {part_2}')
@@ -2,43 +2,99 @@
 # --- Day 2: Cube Conundrum ---
 # PART 1
 
-import re
+import numpy as np
+
+from AOC_2_parser import ID, RED, GREEN, BLUE, read_game_table
 
 # Maximum allowed attempts for each color
 color_max_attempts = {'blue': 14, 'green': 13, 'red': 12}
 
-def check_attempts_validity(attempts):
+# Largest prefix-sum grid BagLimitIndex builds (128 MB of int64), and the number of
+# game-query comparisons made at once without it
+MAX_GRID_CELLS = 1 << 24
+MASK_BLOCK_CELLS = 1 << 22
+
+def sum_valid_games(table, limits):
     """
-    Checks if all attempts in the given list are valid based on the maximum allowed attempts
-    for each color.
+    Sums the ids of all games whose color maxima stay within the given limits.
 
-    :param attempts: A list of strings, each representing an attempt in the format 'number color'.
-    :return: True if all attempts are valid, False otherwise.
+    :param table: Game table as returned by read_game_table.
+    :param limits: A dictionary with the maximum allowed number for each color.
+    :return: Sum of all valid game numbers.
     """
-    for attempt in attempts:
-        # Split each attempt into individual color attempts
-        color_attempts = [info.split() for info in attempt.split(',')]
-        # Check each color attempt against the maximum allowed attempts
-        for number, color in color_attempts:
-            if int(number) > color_max_attempts[color]:
-                return False
-    return True
-
-def extract_game_number(line):
+    valid = ((table[:, RED] <= limits['red'])
+             & (table[:, GREEN] <= limits['green'])
+             & (table[:, BLUE] <= limits['blue']))
+    return int(table[valid, ID].sum())
+
+class BagLimitIndex:
     """
-    Extracts the game number from a line if all attempts are valid.
+    Answers "sum of ids of games possible under limits (r, g, b)" for many limits at once.
+    Each color axis is compressed to its distinct maxima, game ids are accumulated in a
+    3D grid over those axes, and a prefix sum along every axis turns each query into a
+    single lookup of the dominated corner.
 
-    :param line: A string representing a line from the file.
-    :return: The game number if valid, otherwise 0.
+    The grid has one cell per combination of distinct maxima, up to games ** 3 cells. When
+    that exceeds MAX_GRID_CELLS no grid is built, and queries are answered by masking the
+    game table instead, in O(games) per query.
     """
-    game_id, attempts_str = line.split(':')
-    attempts = attempts_str.split(';')
-    # Check if all attempts are valid
-    if check_attempts_validity(attempts):
-        # Find the first number in the game ID
-        game_number = re.search(r'\d+', game_id)
-        return int(game_number.group()) if game_number else 0
-    return 0
+
+    def __init__(self, table):
+        """
+        Builds the compressed axes and the 3D prefix-sum grid.
+
+        :param table: Game table as returned by read_game_table.
+        """
+        self.table = table
+        self.axes = [np.unique(table[:, column]) for column in (RED, GREEN, BLUE)]
+        shape = tuple(axis.size for axis in self.axes)
+        if np.prod(shape, dtype=object) > MAX_GRID_CELLS:
+            self.prefix_sums = None
+            return
+
+        cells = tuple(np.searchsorted(axis, table[:, column])
+                      for axis, column in zip(self.axes, (RED, GREEN, BLUE)))
+
+        self.prefix_sums = np.zeros(shape, dtype=np.int64)
+        np.add.at(self.prefix_sums, cells, table[:, ID])
+        for axis in range(3):
+            np.cumsum(self.prefix_sums, axis=axis, out=self.prefix_sums)
+
+    def query(self, limits):
+        """
+        Sums the ids of all games possible under each of the given bag configurations.
+
+        :param limits: Array-like of shape (queries, 3) with the red, green and blue limits.
+        :return: An int64 array with the sum of valid game numbers for every query.
+        """
+        limits = np.asarray(limits, dtype=np.int64).reshape(-1, 3)
+        if self.prefix_sums is None:
+            return self._query_by_mask(limits)
+
+        # Index of the largest distinct maximum not exceeding each limit, -1 if none
+        cells = tuple(np.searchsorted(axis, limits[:, column], side='right') - 1
+                      for column, axis in enumerate(self.axes))
+        possible = (cells[0] >= 0) & (cells[1] >= 0) & (cells[2] >= 0)
+
+        result = np.zeros(limits.shape[0], dtype=np.int64)
+        if self.prefix_sums.size:
+            result[possible] = self.prefix_sums[tuple(cell[possible] for cell in cells)]
+        return result
+
+    def _query_by_mask(self, limits):
+        """
+        Answers queries without the grid, comparing blocks of queries against all games.
+
+        :param limits: Int64 array of shape (queries, 3) with the red, green and blue limits.
+        :return: An int64 array with the sum of valid game numbers for every query.
+        """
+        colors = self.table[:, [RED, GREEN, BLUE]]
+        block = max(MASK_BLOCK_CELLS // max(len(self.table), 1), 1)
+        result = np.zeros(limits.shape[0], dtype=np.int64)
+        for start in range(0, limits.shape[0], block):
+            valid = (colors[None, :, :] <= limits[start:start + block, None, :]).all(axis=2)
+            result[start:start + block] = valid @ self.table[:, ID]
+        return result
 
 def sum_valid_game_numbers(file_path):
     """
@@ -47,12 +103,7 @@ def sum_valid_game_numbers(file_path):
     :param file_path: Path to the file containing game information.
     :return: Sum of all valid game numbers.
     """
-    total_sum = 0
-    with open(file_path, 'r') as file:
-        # Iterate through each line in the file
-        for line in file:
-            total_sum += extract_game_number(line.strip())
-    return total_sum
+    return sum_valid_games(read_game_table(file_path), color_max_attempts)
 
 # Main execution block
 if __name__ == '__main__':
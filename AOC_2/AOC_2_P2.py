@@ -2,48 +2,27 @@
 # --- Day 2: Cube Conundrum ---
 # PART 2
 
-import re
+import numpy as np
 
-# Limits for each color
-color_limits = {'blue': 14, 'green': 13, 'red': 12}
+from AOC_2_parser import RED, BLUE, read_game_table
 
+# Largest sum that is computed in int64
+INT64_LIMIT = 2 ** 63 - 1
 
-def find_max_for_each_color(attempts):
-    """
-    Finds the maximum number for each color in a given list of attempts.
 
-    :param attempts: A list of attempt strings, each in the format "number color".
-    :return: A dictionary with colors as keys and their maximum numbers as values.
+def sum_of_powers(table):
     """
-    max_values = {color: 0 for color in color_limits.keys()}
-
-    for attempt in attempts:
-        for color_attempt in attempt.split(','):
-            number, color = color_attempt.split()
-            number = int(number)
-            if color in max_values and number > max_values[color]:
-                max_values[color] = number
-
-    return max_values
+    Sums up the product of the maximum values of each color over all games.
 
-
-def calculate_line_product(line):
+    :param table: Game table as returned by read_game_table.
+    :return: The sum of the products for each game.
     """
-    Calculates the product of the maximum values for each color from a given line.
-
-    :param line: A string representing a line from the file.
-    :return: The product of the maximum values.
-    """
-    _, attempts_str = line.split(':')
-    attempts = attempts_str.split(';')
-    max_values = find_max_for_each_color(attempts)
-
-    # Calculate the product, using the max value if found, or 1 otherwise
-    product = 1
-    for color, max_val in max_values.items():
-        product *= max_val if max_val > 0 else 1
-
-    return product
+    # Use the max value if found, or 1 otherwise
+    maxima = np.maximum(table[:, RED:BLUE + 1], 1)
+    # Powers and their sum are exact Python integers whenever int64 could overflow
+    if maxima.size and int(maxima.max()) ** 3 * len(maxima) > INT64_LIMIT:
+        maxima = maxima.astype(object)
+    return int(maxima.prod(axis=1).sum())
 
 
 def sum_product_of_lines(file_path):
@@ -53,12 +32,7 @@ def sum_product_of_lines(file_path):
     :param file_path: Path to the file containing lines to process.
     :return: The sum of the products for each line.
     """
-    total_product_sum = 0
-    with open(file_path, 'r') as file:
-        for line in file:
-            total_product_sum += calculate_line_product(line.strip())
-
-    return total_product_sum
+    return sum_of_powers(read_game_table(file_path))
 
 
 # Main execution block
@@ -0,0 +1,56 @@
+
+# --- Day 2: Cube Conundrum ---
+# SHARED PARSER
+
+import re
+from array import array
+
+import numpy as np
+
+# Colors in the order of their columns in the game table
+COLORS = ('red', 'green', 'blue')
+
+# Column indices of the game table
+ID, RED, GREEN, BLUE = range(4)
+
+game_pattern = re.compile(r'Game (\d+):')
+draw_pattern = re.compile(r'(\d+) (red|green|blue)')
+
+
+def parse_game(line):
+    """
+    Parses a single game line into its id and the maximum drawn number of each color.
+
+    :param line: A string representing a line from the file.
+    :return: Tuple of (game id, max red, max green, max blue), or None for a non-game line.
+    """
+    game = game_pattern.match(line)
+    if not game:
+        return None
+
+    maxima = dict.fromkeys(COLORS, 0)
+    for number, color in draw_pattern.findall(line, game.end()):
+        number = int(number)
+        if number > maxima[color]:
+            maxima[color] = number
+
+    return int(game.group(1)), maxima['red'], maxima['green'], maxima['blue']
+
+
+def read_game_table(file_path):
+    """
+    Reads the file once and builds a compact table with one row per game, holding the
+    game id and the maximum number of red, green and blue cubes seen in any draw.
+
+    :param file_path: Path to the file containing game information.
+    :return: An int64 array of shape (games, 4), indexed by the ID/RED/GREEN/BLUE columns.
+    """
+    # Flat typed buffer, so memory depends on the number of games only
+    rows = array('q')
+    with open(file_path, 'r') as file:
+        for line in file:
+            game = parse_game(line)
+            if game:
+                rows.extend(game)
+
+    return np.frombuffer(rows, dtype=np.int64).reshape(-1, 4)
@@ -2,68 +2,130 @@
 # --- Day 3: Gear Ratios ---
 # PART 1
 
-def get_surrounding_cells(x, y):
-    """
-    Generates the coordinates of surrounding cells in a grid around (x, y).
+import numpy as np
 
-    :param x: X-coordinate of the center cell.
-    :param y: Y-coordinate of the center cell.
-    :return: Generator for coordinates of surrounding cells.
-    """
-    # List of relative positions around the cell
-    neighbor_offsets = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-    for dx, dy in neighbor_offsets:
-        yield x + dx, y + dy
+DOT, NEWLINE, CARRIAGE_RETURN, ZERO, NINE = (ord(char) for char in '.\n\r09')
+
+# Largest sum that is computed in int64, and the most digits of a number that always fits
+INT64_LIMIT = 2 ** 63 - 1
+INT64_DIGITS = 18
 
 
 def read_engine_map(file_path):
     """
-    Reads the engine map from a file.
+    Reads the engine map from a file into a 2D byte grid. Carriage returns and trailing
+    empty lines are ignored.
 
     :param file_path: Path to the file containing the engine map.
-    :return: List of strings, each representing a row of the engine map.
+    :return: 2D uint8 array, one row per line of the engine map.
+    """
+    data = np.fromfile(file_path, dtype=np.uint8)
+    data = data[data != CARRIAGE_RETURN]
+    if data.size and data[-1] != NEWLINE:
+        data = np.append(data, np.uint8(NEWLINE))
+
+    line_ends = np.flatnonzero(data == NEWLINE)
+    widths = np.diff(line_ends, prepend=-1) - 1
+    filled = np.flatnonzero(widths)
+    if not filled.size:
+        return np.zeros((0, 0), dtype=np.uint8)
+
+    rows = filled[-1] + 1
+    width = int(widths[0])
+    if (widths[:rows] != width).any():
+        raise ValueError(f'Rows of the engine map in {file_path} have different widths')
+
+    # All rows have the same width, so the grid is a strided view without the newlines
+    return data[:line_ends[rows - 1] + 1].reshape(rows, width + 1)[:, :width]
+
+
+def dilate(mask):
     """
-    with open(file_path, 'r') as file:
-        return [line.strip() for line in file.readlines()]
+    Marks every cell that is in the mask or next to a cell in the mask, diagonals included.
+
+    :param mask: 2D boolean array.
+    :return: 2D boolean array of the same shape with the dilated mask.
+    """
+    padded = np.pad(mask, 1)
+    height, width = mask.shape
+    dilated = np.zeros_like(mask)
+    for dy in range(3):
+        for dx in range(3):
+            dilated |= padded[dy:dy + height, dx:dx + width]
+    return dilated
+
+
+def label_digit_runs(grid):
+    """
+    Labels every horizontal run of digits in the grid with a span id.
+
+    :param grid: 2D uint8 array of the engine map.
+    :return: Tuple of (labels, values, rows, starts, ends): a 2D array with the span id of
+        every digit cell (-1 elsewhere), and per span id its numeric value, its row and its
+        start and (exclusive) end column. Values are int64, or exact Python integers in an
+        object array if any number has more than INT64_DIGITS digits.
+    """
+    height, width = grid.shape
+    # An extra non-digit column keeps runs from wrapping into the next row
+    is_digit = np.zeros((height, width + 1), dtype=bool)
+    is_digit[:, :width] = (grid >= ZERO) & (grid <= NINE)
+    flat = is_digit.ravel()
+
+    edges = np.diff(flat.astype(np.int8), prepend=np.int8(0))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    lengths = run_ends - run_starts
+
+    cells = np.flatnonzero(flat)
+    labels = np.full(flat.size, -1, dtype=np.int64)
+    labels[cells] = np.repeat(np.arange(run_starts.size), lengths)
+
+    # Each digit contributes digit * 10 ** (distance to the end of its run)
+    digits = np.zeros(flat.size, dtype=np.int64)
+    digits.reshape(height, width + 1)[:, :width] = grid
+    powers = 10 ** (np.repeat(run_ends, lengths) - 1 - cells)
+    contributions = (digits[cells] - ZERO) * powers
+    offsets = np.cumsum(lengths) - lengths
+    values = np.add.reduceat(contributions, offsets) if cells.size else np.zeros(0, dtype=np.int64)
+
+    # Longer numbers overflowed above, parse them exactly from their digits instead
+    long_runs = np.flatnonzero(lengths > INT64_DIGITS)
+    if long_runs.size:
+        values = values.astype(object)
+        for run in long_runs:
+            values[run] = int(digits[run_starts[run]:run_ends[run]].astype(np.uint8).tobytes())
+
+    rows, starts = np.divmod(run_starts, width + 1)
+    return (labels.reshape(height, width + 1)[:, :width], values,
+            rows, starts, starts + lengths)
 
 
 def create_validity_map(engine_map):
     """
-    Creates a map indicating valid part numbers in the engine map.
+    Creates a map indicating cells adjacent to a symbol in the engine map.
 
-    :param engine_map: The engine map as a list of strings.
-    :return: 2D list indicating valid parts (1 for valid, 0 for invalid).
+    :param engine_map: The engine map as a 2D uint8 array.
+    :return: 2D boolean array, True for cells next to (or on) a symbol.
     """
-    validity_map = [[0] * len(engine_map[0]) for _ in engine_map]
-    for y, row in enumerate(engine_map):
-        for x, char in enumerate(row):
-            if char not in ".0123456789":
-                for nx, ny in get_surrounding_cells(x, y):
-                    if 0 <= nx < len(row) and 0 <= ny < len(engine_map):
-                        validity_map[ny][nx] = 1
-    return validity_map
+    is_symbol = (engine_map != DOT) & ((engine_map < ZERO) | (engine_map > NINE))
+    return dilate(is_symbol)
 
 
 def sum_valid_parts(engine_map, validity_map):
     """
-    Sums the part numbers in the engine map that are marked as valid.
+    Sums the part numbers in the engine map that touch a valid cell.
 
-    :param engine_map: The engine map as a list of strings.
-    :param validity_map: 2D list indicating valid parts.
+    :param engine_map: The engine map as a 2D uint8 array.
+    :param validity_map: 2D boolean array indicating valid cells.
     :return: Sum of valid part numbers.
     """
-    sum_parts, current_number, is_valid = 0, '', False
-    for y, row in enumerate(engine_map):
-        for x, char in enumerate(row):
-            if char.isdigit():
-                current_number += char
-                is_valid |= validity_map[y][x]
-            else:
-                if is_valid and current_number:
-                    sum_parts += int(current_number)
-                current_number, is_valid = '', False
-
-    return sum_parts + int(current_number) if is_valid and current_number else sum_parts
+    labels, values, _, _, _ = label_digit_runs(engine_map)
+    is_part = np.zeros(values.size, dtype=bool)
+    is_part[labels[validity_map & (labels >= 0)]] = True
+    parts = values[is_part]
+    if parts.size and int(parts.max()) * parts.size > INT64_LIMIT:
+        parts = parts.astype(object)
+    return int(parts.sum())
 
 
 # Main execution block
@@ -72,4 +134,3 @@ if __name__ == '__main__':
     validity_map = create_validity_map(engine_map)
     total_sum = sum_valid_parts(engine_map, validity_map)
     print(f"Total Sum of Valid Parts: {total_sum}")
-
@@ -0,0 +1,103 @@
+
+# --- Day 3: Gear Ratios ---
+# STREAMING PART 1 + PART 2
+
+import re
+import sys
+from itertools import chain
+
+PART, GEAR = 'part', 'gear'  # Kinds of emitted events
+
+number_pattern = re.compile(r'\d+')
+
+
+def scan_row(row_index, window, gears):
+    """
+    Finds the part numbers of the middle row of a three-row window and records every
+    star they touch.
+
+    :param row_index: Index of the middle row in the whole schematic.
+    :param window: Tuple of the rows above, at and below row_index ('' outside the map).
+    :param gears: Dictionary mapping (row, column) of a star to its adjacent numbers.
+    :return: Generator of (PART, value) events.
+    """
+    current = window[1]
+    for match in number_pattern.finditer(current):
+        value, is_part = int(match.group()), False
+        first, last = max(match.start() - 1, 0), match.end() + 1
+
+        for dy, row in enumerate(window, start=-1):
+            for x in range(first, min(last, len(row))):
+                char = row[x]
+                if char != '.' and not char.isdigit():
+                    is_part = True
+                    if char == '*':
+                        gears.setdefault((row_index + dy, x), []).append(value)
+
+        if is_part:
+            yield PART, value
+
+
+def flush_gears(gears, last_row):
+    """
+    Removes the stars whose rows have left the window and emits the finished gears.
+
+    :param gears: Dictionary mapping (row, column) of a star to its adjacent numbers.
+    :param last_row: Stars up to and including this row are complete.
+    :return: Generator of (GEAR, ratio) events.
+    """
+    for star in [star for star in gears if star[0] <= last_row]:
+        numbers = gears.pop(star)
+        if len(numbers) == 2:
+            yield GEAR, numbers[0] * numbers[1]
+
+
+def stream_engine_map(lines):
+    """
+    Streams over the engine map keeping only a sliding window of three rows, emitting
+    part numbers and gear ratios as soon as their rows leave the window. Memory is
+    proportional to the width of the map, not to its height.
+
+    :param lines: Iterable of the lines of the engine map, e.g. an open file or stdin.
+    :return: Generator of (PART, value) and (GEAR, ratio) events.
+    """
+    gears = {}
+    above, current, row_index = '', None, -1
+
+    # A trailing empty row lets the last real row be scanned as the middle of a window
+    for below in chain((line.rstrip('\r\n') for line in lines), ['']):
+        if current is not None:
+            yield from scan_row(row_index, (above, current, below), gears)
+            # No later row can touch a star above the current row any more
+            yield from flush_gears(gears, row_index - 1)
+            above = current
+        current, row_index = below, row_index + 1
+
+    yield from flush_gears(gears, row_index)
+
+
+def solve(lines):
+    """
+    Computes both parts in a single streaming pass.
+
+    :param lines: Iterable of the lines of the engine map.
+    :return: Tuple of the sum of part numbers and the sum of gear ratios.
+    """
+    totals = {PART: 0, GEAR: 0}
+    for kind, value in stream_engine_map(lines):
+        totals[kind] += value
+    return totals[PART], totals[GEAR]
+
+
+# Main execution block
+if __name__ == '__main__':
+    # Read the file given as argument ('-' for stdin), the puzzle input by default
+    input_path = sys.argv[1] if len(sys.argv) > 1 else 'puzzle_input'
+    if input_path == '-':
+        part_1, part_2 = solve(sys.stdin)
+    else:
+        with open(input_path, 'r') as file:
+            part_1, part_2 = solve(file)
+
+    print(f'Part 1: {part_1}')
+    print(f'Part 2: {part_2}')
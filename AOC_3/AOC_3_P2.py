@@ -2,77 +2,87 @@
 # --- Day 3: Gear Ratios ---
 # PART 2
 
-def read_engine_map(file_path):
-    """
-    Reads the engine map from a file.
+import numpy as np
 
-    :param file_path: Path to the file.
-    :return: List of strings, each representing a row of the engine map.
-    """
-    with open(file_path, 'r') as file:
-        return [line.strip() for line in file.readlines()]
+from AOC_3_P1 import INT64_LIMIT, read_engine_map, label_digit_runs
 
-def get_neighbors(coord_x, coord_y):
-    """
-    Generates neighboring coordinates around a given point.
+# Relative (dy, dx) positions of the eight neighbours of a cell
+neighbor_offsets = [(dy, dx) for dy in range(-1, 2) for dx in range(-1, 2) if dy or dx]
 
-    :param coord_x: X-coordinate of the central point.
-    :param coord_y: Y-coordinate of the central point.
-    :return: Generator for neighboring coordinates.
+class SpanIndex:
     """
-    for dy in range(-1, 2):
-        for dx in range(-1, 2):
-            if dx != 0 or dy != 0:
-                yield coord_x + dx, coord_y + dy
-
-def find_horizontal_numbers(x, y, direction, engine_map):
+    One-time index of the numbers in the engine map. Every digit cell carries the id of
+    its number span, and every span id maps to (value, row, start, end), so neighbour
+    lookups are O(1) and numbers are told apart by identity rather than by value.
     """
-    Recursively finds a number in a horizontal direction from a starting point.
 
-    :param x: Starting X-coordinate.
-    :param y: Starting Y-coordinate.
-    :param direction: Direction for horizontal search (1 for right, -1 for left).
-    :param engine_map: The engine map data.
-    :return: Number found in the specified direction.
-    """
-    if 0 <= x < len(engine_map[0]) and engine_map[y][x].isdigit():
-        return engine_map[y][x] + find_horizontal_numbers(x + direction, y, direction, engine_map)
-    return ''
+    def __init__(self, engine_map):
+        """
+        Labels all number spans of the engine map.
 
-def get_numbers_around_star(x, y, engine_map):
-    """
-    Gets numbers surrounding a star in the engine map.
+        :param engine_map: The engine map as a 2D uint8 array.
+        """
+        self.engine_map = engine_map
+        self.labels, self.values, self.rows, self.starts, self.ends = label_digit_runs(engine_map)
+        # Padded copy of the labels, so neighbours of border cells need no bounds checks
+        self.padded_labels = np.pad(self.labels, 1, constant_values=-1)
 
-    :param x: X-coordinate of the star.
-    :param y: Y-coordinate of the star.
-    :param engine_map: The engine map data.
-    :return: List of numbers found around the star.
-    """
-    numbers = set()
-    for nx, ny in get_neighbors(x, y):
-        if 0 <= ny < len(engine_map) and 0 <= nx < len(engine_map[0]):
-            left_number = find_horizontal_numbers(nx - 1, ny, -1, engine_map)
-            right_number = find_horizontal_numbers(nx + 1, ny, 1, engine_map)
-            full_number = left_number[::-1] + engine_map[ny][nx] + right_number
-            if full_number.isdigit():
-                numbers.add(int(full_number))
-    return numbers
+    def spans_around_symbol(self, symbol):
+        """
+        Finds the distinct number spans adjacent to every occurrence of a symbol.
+
+        :param symbol: The symbol character, e.g. '*'.
+        :return: Tuple of an (n, 2) array of (y, x) positions of the symbol and an (n, 8)
+            array of adjacent span ids per position, each distinct id once, padded with -1.
+        """
+        positions = np.argwhere(self.engine_map == ord(symbol))
+        y, x = positions[:, 0] + 1, positions[:, 1] + 1
+        spans = np.stack([self.padded_labels[y + dy, x + dx] for dy, dx in neighbor_offsets], axis=1)
+
+        # Sort each row so repeated ids of the same span sit next to each other
+        spans.sort(axis=1)
+        spans[:, 1:][spans[:, 1:] == spans[:, :-1]] = -1
+        spans.sort(axis=1)
+        return positions, spans[:, ::-1]
+
+    def symbols_with_parts(self, symbol, count):
+        """
+        Finds the occurrences of a symbol with exactly the given number of adjacent parts.
+
+        :param symbol: The symbol character, e.g. '*'.
+        :param count: Required number of adjacent parts.
+        :return: Tuple of an (n, 2) array of (y, x) positions and an (n, count) array of
+            the span ids adjacent to each of them.
+        """
+        positions, spans = self.spans_around_symbol(symbol)
+        matching = (spans >= 0).sum(axis=1) == count
+        return positions[matching], spans[matching, :count]
+
+    def parts_around_symbol(self, symbol):
+        """
+        Finds all number spans adjacent to at least one occurrence of a symbol.
+
+        :param symbol: The symbol character.
+        :return: Sorted array of distinct span ids.
+        """
+        _, spans = self.spans_around_symbol(symbol)
+        return np.unique(spans[spans >= 0])
 
 def calculate_total_sum(engine_map):
     """
-    Calculates the total sum based on the engine map criteria.
+    Calculates the sum of gear ratios, i.e. of the products of the two numbers adjacent
+    to every star that touches exactly two numbers.
 
     :param engine_map: The engine map data.
     :return: Total sum calculated from the engine map.
     """
-    total = 0
-    for y, row in enumerate(engine_map):
-        for x, char in enumerate(row):
-            if char == '*':
-                surrounding_numbers = get_numbers_around_star(x, y, engine_map)
-                if len(surrounding_numbers) == 2:
-                    total += surrounding_numbers.pop() * surrounding_numbers.pop()
-    return total
+    index = SpanIndex(engine_map)
+    _, spans = index.symbols_with_parts('*', 2)
+    values = index.values[spans]
+    # Gear ratios and their sum are exact Python integers whenever int64 could overflow
+    if values.size and int(values.max()) ** 2 * len(values) > INT64_LIMIT:
+        values = values.astype(object)
+    return int(values.prod(axis=1).sum())
 
 # Main execution
 if __name__ == '__main__':
@@ -2,50 +2,35 @@
 # --- Day 4: Scratchcards ---
 # PART 1
 
-def read_card_data(file_path):
-    """
-    Reads card data from a file.
+import numpy as np
 
-    :param file_path: Path to the file.
-    :return: List of tuples containing winning and given numbers for each line.
-    """
-    with open(file_path, 'r') as file:
-        return [parse_line_data(line.strip()) for line in file]
+from AOC_4_parser import read_card_masks, count_all_matches
 
-def parse_line_data(line):
-    """
-    Parses a line of the file to extract winning and given numbers.
+# Largest total that is computed in int64
+INT64_LIMIT = 2 ** 63 - 1
 
-    :param line: A string representing a line from the file.
-    :return: A tuple containing sets of winning numbers and given numbers.
-    """
-    parts = line.split(":")
-    winning_numbers = set(parts[1].split("|")[0].split())
-    numbers_given = parts[1].split("|")[1].split()
-    return winning_numbers, numbers_given
-
-def compute_points_for_line(winning_numbers, numbers_given):
+def read_card_data(file_path):
     """
-    Computes the points for a line based on the winning and given numbers.
+    Reads card data from a file.
 
-    :param winning_numbers: Set of winning numbers.
-    :param numbers_given: List of given numbers.
-    :return: Points earned for the line.
+    :param file_path: Path to the file.
+    :return: Tuple of packed winning and given number rows, one row per card.
     """
-    points = 0
-    for num in numbers_given:
-        if num in winning_numbers:
-            points = 1 if points == 0 else points * 2
-    return points
+    return read_card_masks(file_path)
 
 def calculate_total_points(card_data):
     """
     Calculates the total points based on all lines of card data.
 
-    :param card_data: List of tuples containing winning and given numbers.
+    :param card_data: Tuple of packed winning and given number rows.
     :return: Total points calculated.
     """
-    return sum(compute_points_for_line(winning, given) for winning, given in card_data)
+    matches = count_all_matches(*card_data)
+    if matches.size and (1 << int(matches.max())) * matches.size > INT64_LIMIT:
+        # Points of cards with many matches do not fit into int64, use exact integers
+        return sum(1 << count >> 1 for count in matches.tolist())
+    # One point for the first match, doubled for every further match
+    return int((np.left_shift(1, matches) >> 1).sum())
 
 # Main execution block
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+
+# --- Day 4: Scratchcards ---
+# SHARED PARSER
+
+import numpy as np
+
+
+def parse_numbers(text):
+    """
+    Encodes a whitespace separated list of card numbers as an integer bitmask.
+
+    :param text: A string of numbers separated by whitespace.
+    :return: Integer with bit n set for every number n in the text.
+    """
+    mask = 0
+    for number in text.split():
+        mask |= 1 << int(number)
+    return mask
+
+
+def parse_card(line):
+    """
+    Parses a line of the file into bitmasks of the winning and the given numbers.
+
+    :param line: A string representing a line from the file.
+    :return: A tuple of the winning numbers bitmask and the given numbers bitmask.
+    """
+    winning, given = line.split(':')[1].split('|')
+    return parse_numbers(winning), parse_numbers(given)
+
+
+def count_matches(winning, given):
+    """
+    Counts the given numbers that are also winning numbers.
+
+    :param winning: Bitmask of the winning numbers.
+    :param given: Bitmask of the given numbers.
+    :return: Number of matches on the card.
+    """
+    return bin(winning & given).count('1')
+
+
+def read_card_masks(file_path, max_number=None):
+    """
+    Reads all cards into packed bit rows, one row of bytes per card and side.
+
+    :param file_path: Path to the file.
+    :param max_number: Largest card number that can occur in the file, or None to size
+        the rows by the largest number actually found.
+    :return: Tuple of two uint8 arrays of shape (cards, bytes) for the winning and the
+        given numbers.
+    """
+    with open(file_path, 'r') as file:
+        cards = [parse_card(line) for line in file if line.strip()]
+
+    largest = max((max(winning, given).bit_length() - 1 for winning, given in cards), default=0)
+    if max_number is None:
+        max_number = max(largest, 0)
+    elif largest > max_number:
+        raise ValueError(f'Card number {largest} in {file_path} exceeds the maximum of {max_number}')
+
+    width = max_number // 8 + 1
+    winning_rows = b''.join(winning.to_bytes(width, 'little') for winning, _ in cards)
+    given_rows = b''.join(given.to_bytes(width, 'little') for _, given in cards)
+
+    return (np.frombuffer(winning_rows, dtype=np.uint8).reshape(-1, width),
+            np.frombuffer(given_rows, dtype=np.uint8).reshape(-1, width))
+
+
+def count_all_matches(winning_rows, given_rows):
+    """
+    Counts the matches of all cards at once as the popcount of the AND of their rows.
+
+    :param winning_rows: Packed winning numbers, as returned by read_card_masks.
+    :param given_rows: Packed given numbers, as returned by read_card_masks.
+    :return: An int64 array with the number of matches per card.
+    """
+    return np.bitwise_count(winning_rows & given_rows).sum(axis=1, dtype=np.int64)
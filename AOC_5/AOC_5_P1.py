@@ -2,6 +2,99 @@
 # --- Day 5: If You Give A Seed A Fertilizer ---
 # PART 1
 
+from bisect import bisect_right
+from functools import reduce
+from math import inf
+
+import numpy as np
+
+class PiecewiseMap:
+    """
+    A map made of consecutive segments that each shift values by a constant offset.
+    Segment i covers starts[i] <= value < starts[i + 1] and maps value to value + offsets[i];
+    the first segment starts at -inf, so the segments cover every value.
+    """
+
+    def __init__(self, starts, offsets):
+        """
+        Creates the map from its segments, merging neighbours with the same offset.
+
+        :param starts: Sorted list of segment starts, beginning with -inf.
+        :param offsets: List of offsets, one per segment.
+        """
+        self.starts, self.offsets = [], []
+        for start, offset in zip(starts, offsets):
+            if self.offsets and self.offsets[-1] == offset:
+                continue
+            self.starts.append(start)
+            self.offsets.append(offset)
+
+        # Array form of the segments for vectorized lookups, without the -inf start
+        self.bounds = np.array(self.starts[1:], dtype=np.int64)
+        self.offset_array = np.array(self.offsets, dtype=np.int64)
+
+    @classmethod
+    def from_section(cls, section):
+        """
+        Compiles an almanac section into a map, filling the gaps between rules with identity segments.
+
+        :param section: Text of one map section, including its title line.
+        :return: The compiled map.
+        """
+        _, *lines = section.strip().split('\n')
+        rules = sorted((src, src + n, dst - src) for dst, src, n in (map(int, line.split()) for line in lines))
+
+        starts, offsets, position = [], [], -inf
+        for src, end, offset in rules:
+            if position < src:
+                starts.append(position)
+                offsets.append(0)
+            starts.append(src)
+            offsets.append(offset)
+            position = end
+        starts.append(position)
+        offsets.append(0)
+        return cls(starts, offsets)
+
+    def __call__(self, val):
+        """
+        Maps a value with a single binary search.
+
+        :param val: Value to map.
+        :return: Mapped value.
+        """
+        return val + self.offsets[bisect_right(self.starts, val) - 1]
+
+    def map_array(self, values):
+        """
+        Maps a whole array of values with one vectorized binary search.
+
+        :param values: An int64 array of values.
+        :return: An int64 array of mapped values.
+        """
+        return values + self.offset_array[np.searchsorted(self.bounds, values, side='right')]
+
+    def then(self, other):
+        """
+        Composes this map with another one applied afterwards.
+
+        :param other: Map to apply to the results of this map.
+        :return: A map equal to applying this map and then the other map.
+        """
+        starts, offsets = [], []
+        ends = self.starts[1:] + [inf]
+
+        for start, end, offset in zip(self.starts, ends, self.offsets):
+            # Split this segment wherever its image crosses a segment start of the other map
+            index = bisect_right(other.starts, start + offset) - 1
+            while start < end:
+                starts.append(start)
+                offsets.append(offset + other.offsets[index])
+                index += 1
+                start = other.starts[index] - offset if index < len(other.starts) else inf
+
+        return PiecewiseMap(starts, offsets)
+
 def read_file_data(file_path):
     """
     Reads the file data and separates the seeds and maps.
@@ -14,32 +107,67 @@ def read_file_data(file_path):
     seeds, *maps = content.split('\n\n')
     return seeds, maps
 
+def compile_maps(maps):
+    """
+    Compiles the map sections once into piecewise maps.
+
+    :param maps: List of map sections as text.
+    :return: List of compiled maps, in almanac order.
+    """
+    return [PiecewiseMap.from_section(m) for m in maps]
+
+def compose_maps(map_list):
+    """
+    Composes a series of compiled maps into a single seed to location map.
+
+    :param map_list: List of compiled maps, in almanac order.
+    :return: A single compiled map equal to applying all maps in order.
+    """
+    return reduce(PiecewiseMap.then, map_list, PiecewiseMap([-inf], [0]))
+
 def process_maps(val, map_list):
     """
     Processes a value through a series of maps.
 
     :param val: Initial value to process.
-    :param map_list: List of maps to apply to the value.
+    :param map_list: List of compiled maps to apply to the value.
     :return: Processed value after applying all maps.
     """
     for m in map_list:
-        val = map_value(val, m)
+        val = m(val)
     return val
 
-def map_value(val, m):
+def map_seed_array(seeds, map_list, chunk_size=1 << 20):
     """
-    Maps a value using a single map.
+    Pushes an array of seeds through a series of maps, one chunk at a time so that
+    temporary memory stays bounded by the chunk size.
 
-    :param val: Value to map.
-    :param m: Map to use for mapping the value.
-    :return: Mapped value.
+    :param seeds: An int64 array of seeds.
+    :param map_list: List of compiled maps to apply.
+    :param chunk_size: Number of seeds mapped at once.
+    :return: An int64 array of mapped values.
     """
-    _, *lines = m.split('\n')
-    for line in lines:
-        dst, src, n = map(int, line.split())
-        if src <= val < src + n:
-            return val - src + dst
-    return val
+    seeds = np.asarray(seeds, dtype=np.int64)
+    mapped = np.empty_like(seeds)
+    for start in range(0, seeds.size, chunk_size):
+        chunk = seeds[start:start + chunk_size]
+        for m in map_list:
+            chunk = m.map_array(chunk)
+        mapped[start:start + chunk_size] = chunk
+    return mapped
+
+def min_mapped_seed(seeds, map_list, chunk_size=1 << 20):
+    """
+    Finds the minimum mapped value of an array of seeds without keeping the mapped array.
+
+    :param seeds: An int64 array of seeds.
+    :param map_list: List of compiled maps to apply.
+    :param chunk_size: Number of seeds mapped at once.
+    :return: Minimum mapped value.
+    """
+    seeds = np.asarray(seeds, dtype=np.int64)
+    return min(int(map_seed_array(seeds[start:start + chunk_size], map_list, chunk_size).min())
+               for start in range(0, seeds.size, chunk_size))
 
 def find_minimum_mapped_value(filename):
     """
@@ -49,9 +177,8 @@ def find_minimum_mapped_value(filename):
     :return: Minimum mapped value.
     """
     seeds, maps = read_file_data(filename)
-    seed_values = map(int, seeds.split()[1:])
-    mapped_values = [process_maps(seed, maps) for seed in seed_values]
-    return min(mapped_values)
+    seed_to_location = compose_maps(compile_maps(maps))
+    return min(seed_to_location(seed) for seed in map(int, seeds.split()[1:]))
 
 # Main execution block
 if __name__ == '__main__':
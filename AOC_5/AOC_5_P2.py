@@ -2,38 +2,87 @@
 # --- Day 5: If You Give A Seed A Fertilizer ---
 # PART 2
 
-from functools import reduce  # Import the 'reduce' function from the 'functools' module
-
-# Open the file 'puzzle_input', read its content, and split it into sections by double newline.
-# Assign the first section to 'seeds' and the rest to 'mappings'.
-with open('puzzle_input') as file:
-    seeds, *mappings = file.read().split('\n\n')
-
-# Converting the seed values from strings to integers, skipping the first item.
-seeds = list(map(int, seeds.split()[1:]))
-
-# Define the 'lookup' function to process inputs based on a given mapping.
-def lookup(inputs, mapping):
-    for start, length in inputs:  # Iterate over each pair of start and length in the inputs.
-        while length > 0:  # Continue processing while there is length remaining.
-            for m in mapping.split('\n')[1:]:  # Iterate over each line in the mapping, skipping the first line.
-                dst, src, len = map(int, m.split())  # Extract destination, source, and length from the mapping line.
-                delta = start - src  # Calculate the delta between start and source.
-                if 0 <= delta < len:  # Check if delta is within the range of the mapping length.
-                    len = min(len - delta, length)  # Calculate the effective length to process.
-                    yield (dst + delta, len)  # Yield the new start position and the processed length.
-                    start += len  # Update start for next iteration.
-                    length -= len  # Update length for next iteration.
-                    break  # Break the loop to process the next part of the input.
-            else:
-                yield (start, length)  # Yield the remaining part of the input if no mapping applies.
-                break
-
-# Process the seeds and print the results.
-# Pair the seeds, apply the lookup function through all mappings,
-# and find the minimum result for each pair.
-pairs = zip(seeds[::2], seeds[1::2])  # Creating pairs from the seeds
-result = [min(reduce(lookup, mappings, [pair]))[0] for pair in pairs]  # Processing each pair through the mappings
-print(*result)
-
-# Putting each result in the Advent of Code result until it works
+from math import inf
+
+from AOC_5_P1 import read_file_data, compile_maps
+
+def parse_seed_ranges(seeds):
+    """
+    Parses the seeds line into sorted, coalesced half-open ranges.
+
+    :param seeds: The seeds section of the almanac.
+    :return: List of (start, end) tuples.
+    """
+    values = list(map(int, seeds.split()[1:]))
+    return coalesce_ranges((start, start + length) for start, length in zip(values[::2], values[1::2]))
+
+def coalesce_ranges(ranges):
+    """
+    Sorts half-open ranges and merges the ones that overlap or touch.
+
+    :param ranges: Iterable of (start, end) tuples.
+    :return: Sorted list of disjoint (start, end) tuples.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def map_ranges(ranges, piecewise_map):
+    """
+    Maps a whole set of ranges through one compiled map. Both the ranges and the map
+    segments are sorted, so they are split against each other in one merge pass.
+
+    :param ranges: Sorted list of disjoint (start, end) tuples.
+    :param piecewise_map: Compiled map to apply.
+    :return: Sorted list of disjoint mapped (start, end) tuples.
+    """
+    starts, offsets = piecewise_map.starts, piecewise_map.offsets
+    mapped, index = [], 0
+
+    for start, end in ranges:
+        # Advance to the segment containing the start of the range
+        while index + 1 < len(starts) and starts[index + 1] <= start:
+            index += 1
+        while start < end:
+            bound = starts[index + 1] if index + 1 < len(starts) else inf
+            piece_end = min(end, bound)
+            mapped.append((start + offsets[index], piece_end + offsets[index]))
+            start = piece_end
+            if start == bound:
+                index += 1
+
+    return coalesce_ranges(mapped)
+
+def lowest_location(seed_ranges, map_list):
+    """
+    Pushes the seed ranges through all maps and returns the lowest resulting value.
+
+    :param seed_ranges: Sorted list of disjoint (start, end) seed ranges.
+    :param map_list: List of compiled maps, in almanac order.
+    :return: The lowest location, or None if there are no seeds.
+    """
+    ranges = seed_ranges
+    for piecewise_map in map_list:
+        ranges = map_ranges(ranges, piecewise_map)
+    return ranges[0][0] if ranges else None
+
+def find_lowest_location(file_path):
+    """
+    Finds the lowest location of any seed in the seed ranges of the file.
+
+    :param file_path: Path to the file containing seeds and maps.
+    :return: The lowest location.
+    """
+    seeds, maps = read_file_data(file_path)
+    return lowest_location(parse_seed_ranges(seeds), compile_maps(maps))
+
+# Main execution block
+if __name__ == '__main__':
+    result = find_lowest_location('puzzle_input')
+    print(f"Lowest Location: {result}")
@@ -4,6 +4,8 @@
 
 import math
 
+import numpy as np
+
 def read_file(file_name: str) -> str:
     """Reads the entire content from the specified file."""
     with open(file_name, 'r') as file:
@@ -32,15 +34,80 @@ def parse_times_and_distances(data_str: str, fix_kerning: bool) -> list:
     return list(zip(times, distances))
 
 
+# Largest time and record for which the discriminant fits comfortably into int64
+MAX_BATCH_TIME = 1 << 30
+MAX_BATCH_RECORD = 1 << 59
+
+
 def calculate_options_for_race(record: int, distance: int) -> int:
     """
-    Calculates the number of options for a single race.
+    Calculates the number of options for a single race, exactly and in constant time.
+    Holding the button for h ms beats the distance when h * (record - h) > distance,
+    i.e. strictly between the roots of h^2 - record * h + distance; the lower bound is
+    found with an integer square root and the count follows from symmetry.
 
     :param record: Record time for the race.
     :param distance: Distance for the race.
     :return: Number of options where the record can be beaten.
     """
-    return sum(1 for delay in range(1, distance) if distance / delay + delay < record)
+    discriminant = record * record - 4 * distance
+    if discriminant <= 0:
+        return 0
+
+    # Smallest winning hold time, the largest one mirrors it around record / 2
+    low = (record - math.isqrt(discriminant)) // 2
+    if low * (record - low) <= distance:
+        low += 1
+    low = max(low, 0)
+    return max(record - 2 * low + 1, 0)
+
+
+def _options_for_races_int64(records: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of calculate_options_for_race for int64 arrays within the batch limits.
+
+    :param records: Array of record times.
+    :param distances: Array of distances.
+    :return: Array with the number of options for each race.
+    """
+    discriminant = records * records - 4 * distances
+    positive = discriminant > 0
+    discriminant = np.where(positive, discriminant, 0)
+
+    # Float square root, corrected to the exact integer square root
+    root = np.sqrt(discriminant.astype(np.float64)).astype(np.int64)
+    root -= root * root > discriminant
+    root += (root + 1) * (root + 1) <= discriminant
+
+    low = (records - root) // 2
+    low += low * (records - low) <= distances
+    low = np.maximum(low, 0)
+    return np.where(positive, np.maximum(records - 2 * low + 1, 0), 0)
+
+
+def calculate_options_for_races(records, distances) -> np.ndarray:
+    """
+    Calculates the number of options for many races at once. Races whose values fit into
+    int64 are solved with NumPy, the others exactly with Python integers.
+
+    :param records: Sequence or array of record times.
+    :param distances: Sequence or array of distances.
+    :return: Array with the number of options for each race; of dtype object if any race
+        needed the exact fallback.
+    """
+    records, distances = np.asarray(records), np.asarray(distances)
+    fits = ((records >= 0) & (records < MAX_BATCH_TIME)
+            & (distances >= 0) & (distances < MAX_BATCH_RECORD)).astype(bool)
+
+    if fits.all() and records.dtype.kind == 'i' and distances.dtype.kind == 'i':
+        return _options_for_races_int64(records.astype(np.int64), distances.astype(np.int64))
+
+    options = np.empty(records.shape, dtype=object)
+    options[fits] = _options_for_races_int64(records[fits].astype(np.int64),
+                                             distances[fits].astype(np.int64))
+    options[~fits] = [calculate_options_for_race(int(record), int(distance))
+                      for record, distance in zip(records[~fits], distances[~fits])]
+    return options
 
 
 def solve_task_1(races: list) -> int:
@@ -52,12 +119,9 @@ def solve_task_1(races: list) -> int:
 
 def solve_task_2(race: tuple) -> int:
     """
-    Solves the second task by finding the difference between two possible delay values.
+    Solves the second task by counting the options of the single race with fixed kerning.
     """
-    record, distance = race
-    x1 = (record - math.sqrt(record ** 2 - 4 * distance)) // 2
-    x2 = (record + math.sqrt(record ** 2 - 4 * distance)) // 2
-    return int(abs(x1 - x2))
+    return calculate_options_for_race(*race)
 
 
 def main():
@@ -1,45 +1,441 @@
 
 # --- Day 7: Camel Cards ---
 
+import os
+import tempfile
+from array import array
+from contextlib import ExitStack
+from functools import lru_cache
+
+import numpy as np
+
+# Hand type rank by the two largest card counts, from high card (0) to five of a kind (6)
+hand_types = {(1, 1): 0, (2, 1): 1, (2, 2): 2, (3, 1): 3, (3, 2): 4, (4, 1): 5, (5, 0): 6}
+
+CARD_BITS = 4  # Every card value fits into 4 bits
+TYPE_SHIFT = 5 * CARD_BITS  # The type rank sits above the five card values
+
+# Cards in rank order, used to index every possible hand as a base-13 number
+CARDS = '23456789TJQKA'
+card_ranks = {card: rank for rank, card in enumerate(CARDS)}
+
+PLAIN, JOKER = 0, 1  # Rule sets, i.e. rows of the hand type table
+# Supported face value strings and their rule set: plain cards, or J as the joker
+face_rules = {'ABCDE': PLAIN, 'A0CDE': JOKER}
+HAND_TYPE_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hand_type_table.npy')
+
+
+def face_rule(face):
+    """
+  Finds the rule set of the hand type table that matches a face value string.
+
+  :param face: String of replacement faces for 'TJQKA'.
+  :return: PLAIN or JOKER.
+  """
+    if face not in face_rules:
+        raise ValueError(f'Unsupported face values {face!r}, expected one of {", ".join(face_rules)}')
+    return face_rules[face]
+
+
+@lru_cache(maxsize=None)
+def card_values(face):
+    """
+  Builds the table of card values for the given face values, computed once per face string.
+
+  :param face: String of replacement faces for 'TJQKA'; '0' marks a joker.
+  :return: Dictionary mapping each card character to its value, jokers being 0.
+  """
+    values = {str(digit): digit for digit in range(2, 10)}
+    for card, replacement in zip('TJQKA', face):
+        values[card] = 0 if replacement == '0' else 10 + 'ABCDE'.index(replacement)
+    return values
+
+
+def generate_hand_type_table():
+    """
+  Generates the type rank of every possible hand for both rule sets.
+
+  :return: A uint8 array of shape (2, 13 ** 5), indexed by rule set and hand index.
+  """
+    hands = np.arange(len(CARDS) ** 5)
+    ranks = np.stack([hands // len(CARDS) ** power % len(CARDS) for power in range(5)], axis=1)
+    counts = (ranks[:, :, None] == np.arange(len(CARDS))).sum(axis=1)
+
+    # Type rank by the two largest card counts, padded for impossible combinations
+    types = np.zeros((6, 6), dtype=np.uint8)
+    for (first, second), rank in hand_types.items():
+        types[first, second] = rank
+
+    table = np.empty((2, hands.size), dtype=np.uint8)
+    for rule in (PLAIN, JOKER):
+        jokers = np.zeros(hands.size, dtype=counts.dtype)
+        if rule == JOKER:
+            jokers = counts[:, card_ranks['J']].copy()
+            counts[:, card_ranks['J']] = 0
+        top = np.sort(counts, axis=1)
+        # Jokers are always best used as more of the most common card
+        first = np.minimum(top[:, -1] + jokers, 5)
+        second = np.where(first < 5, top[:, -2], 0)
+        table[rule] = types[first, second]
+    return table
+
+
+@lru_cache(maxsize=None)
+def load_hand_type_table(path=HAND_TYPE_TABLE_PATH):
+    """
+  Loads the hand type table memory-mapped from disk, generating and saving it on first use.
+  A cached file of the wrong shape or type is regenerated, and if the table cannot be
+  written (e.g. a read-only checkout) it is kept in memory instead.
+
+  :param path: Path of the cached table.
+  :return: A uint8 array of shape (2, 13 ** 5).
+  """
+    if os.path.exists(path):
+        try:
+            table = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            table = None
+        if table is not None and table.shape == (2, len(CARDS) ** 5) and table.dtype == np.uint8:
+            return table
+
+    table = generate_hand_type_table()
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temporary_path, 'wb') as file:
+            np.save(file, table)
+        os.replace(temporary_path, path)
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        return table
+    return np.load(path, mmap_mode='r')
+
+
 def eval_hand(line, face):
     """
   Evaluates a hand of cards and its bid based on the given line and face values.
 
   :param line: String containing a hand of cards and its bid.
-  :param face: String representing face values to be used for translation.
-  :return: Tuple containing the score of the hand, the hand itself, and the bid.
+  :param face: String representing face values to be used for translation, one of face_rules.
+  :return: Tuple containing the packed integer key of the hand and the bid.
   """
+    rule = face_rule(face)
     hand, bid = line.split()
-    # Translate hand to the specified face values
-    hand = hand.translate(str.maketrans('TJQKA', face))
-    # Determine the best score for the hand
-    best = max(calculate_hand_score(hand.replace('0', r)) for r in hand)
-    return best, hand, int(bid)
+    values = card_values(face)
+
+    key = index = 0
+    for card in hand:
+        key = key << CARD_BITS | values[card]
+        index = index * len(CARDS) + card_ranks[card]
+
+    return int(load_hand_type_table()[rule, index]) << TYPE_SHIFT | key, int(bid)
+
+
+def sort_hands(evaluated_hands):
+    """
+  Sorts hands by their packed keys, equal hands by bid, comparing plain integers only.
+
+  :param evaluated_hands: Int64 array of shape (hands, 2) with a key and a bid per row.
+  :return: The sorted array.
+  """
+    return evaluated_hands[np.lexsort((evaluated_hands[:, 1], evaluated_hands[:, 0]))]
+
+
+def calculate_total_winnings(evaluated_hands):
+    """
+  Ranks the hands by their packed keys and sums up rank times bid.
+
+  :param evaluated_hands: List of (key, bid) tuples, or an equivalent array.
+  :return: Total winnings.
+  """
+    bids = sort_hands(np.asarray(evaluated_hands, dtype=np.int64).reshape(-1, 2))[:, 1]
+    return int((np.arange(1, len(bids) + 1, dtype=np.int64) * bids).sum())
+
+
+class FenwickTree:
+    """
+  Binary indexed tree over a fixed range of integer positions, backed by a compact array.
+  """
+
+    def __init__(self, size):
+        """
+    Creates a tree with all values set to zero.
+
+    :param size: Number of positions.
+    """
+        # Repeating a one-element array allocates the buffer without an intermediate copy
+        self.tree = array('q', [0]) * (size + 1)
+
+    def add(self, position, delta):
+        """
+    Adds a delta to the value at a position in O(log size).
+
+    :param position: Position to update.
+    :param delta: Value to add.
+    """
+        position += 1
+        while position < len(self.tree):
+            self.tree[position] += delta
+            position += position & -position
 
+    def prefix_sum(self, position):
+        """
+    Sums the values of all positions below the given one in O(log size).
 
-def calculate_hand_score(hand):
+    :param position: Exclusive upper bound of the summed positions.
+    :return: The sum.
     """
-  Calculates the score of a hand.
+        total = 0
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+        return total
 
-  :param hand: String representing a hand of cards.
-  :return: Sorted list of counts of each card in the hand, in descending order.
+
+class BidTree:
+    """
+  Binary indexed tree over the bids of identical hands, counting the hands and summing
+  their bids. Only touched nodes are stored and the range doubles on demand, so every
+  operation takes O(log largest bid) however many identical hands there are.
+  """
+
+    __slots__ = ('counts', 'sums', 'size', 'count', 'total')
+
+    def __init__(self):
+        """
+    Creates an empty tree.
+    """
+        self.counts, self.sums = {}, {}
+        self.size = 1
+        self.count = self.total = 0
+
+    def add(self, bid, count):
+        """
+    Adds or removes hands with the given bid.
+
+    :param bid: Non-negative bid of the hands.
+    :param count: Number of hands to add, negative to remove.
+    """
+        if bid < 0:
+            raise ValueError(f'Bids must not be negative, got {bid}')
+        position = bid + 1
+        while position > self.size:
+            # The single new node at the doubled size covers every position so far
+            self.size *= 2
+            if self.count:
+                self.counts[self.size], self.sums[self.size] = self.count, self.total
+
+        self.count += count
+        self.total += count * bid
+        while position <= self.size:
+            self.counts[position] = self.counts.get(position, 0) + count
+            self.sums[position] = self.sums.get(position, 0) + count * bid
+            position += position & -position
+
+    def prefix(self, bid):
+        """
+    Counts the hands with a bid up to the given one and sums their bids.
+
+    :param bid: Inclusive upper bound of the bids.
+    :return: Tuple of the number of hands and the sum of their bids.
+    """
+        position = min(bid + 1, self.size)
+        count = total = 0
+        while position > 0:
+            count += self.counts.get(position, 0)
+            total += self.sums.get(position, 0)
+            position -= position & -position
+        return count, total
+
+
+class WinningsLedger:
+    """
+  Maintains the total winnings of a changing set of hands. Hand counts and bid sums are
+  kept in Fenwick trees over a dense rank of the hand keys, so inserting or removing a
+  hand updates the total in O(log n) from the hands ranked below and above it, and the
+  current total can be read at any time.
+  """
+
+    def __init__(self, face='ABCDE'):
+        """
+    Creates an empty ledger.
+
+    :param face: Face value string the hand keys are evaluated with.
+    """
+        face_rule(face)  # Only keys of a supported face value string can be ranked
+        # Order-preserving rank of every card value, so that keys map densely to
+        # type * 13 ** 5 + the card values as a base-13 number
+        self.value_ranks = [0] * (1 << CARD_BITS)
+        for rank, value in enumerate(sorted(set(card_values(face).values()))):
+            self.value_ranks[value] = rank
+
+        key_space = len(hand_types) * len(CARDS) ** 5
+        self.counts = FenwickTree(key_space)
+        self.bid_sums = FenwickTree(key_space)
+        # Bids of identical hands, which are ranked among themselves by bid
+        self.same_hand_bids = {}
+        self.total_bids = 0
+        self.total_winnings = 0
+
+    def _dense_key(self, key):
+        """
+    Converts a packed hand key into its position in the dense key space.
+
+    :param key: Packed key of the hand, as returned by eval_hand.
+    :return: The dense key, ordered like the packed keys.
+    """
+        dense = key >> TYPE_SHIFT
+        for shift in range(TYPE_SHIFT - CARD_BITS, -1, -CARD_BITS):
+            dense = dense * len(CARDS) + self.value_ranks[key >> shift & (1 << CARD_BITS) - 1]
+        return dense
+
+    def _position(self, dense, bid):
+        """
+    Finds where a hand ranks, after all hands with a smaller key or an equal key and bid.
+
+    :param dense: Dense key of the hand.
+    :param bid: Bid of the hand.
+    :return: Tuple of the number of hands and the sum of bids ranked before that position.
+    """
+        same_hand_bids = self.same_hand_bids.get(dense)
+        equal_before, equal_bids = same_hand_bids.prefix(bid) if same_hand_bids else (0, 0)
+        return (self.counts.prefix_sum(dense) + equal_before,
+                self.bid_sums.prefix_sum(dense) + equal_bids)
+
+    def insert(self, key, bid):
+        """
+    Adds a hand: it takes its rank times its bid, and every hand above it moves up a rank.
+
+    :param key: Packed key of the hand, as returned by eval_hand.
+    :param bid: Bid of the hand.
+    """
+        dense = self._dense_key(key)
+        below, bids_below = self._position(dense, bid)
+        self.total_winnings += (below + 1) * bid + self.total_bids - bids_below
+        self.total_bids += bid
+
+        self.counts.add(dense, 1)
+        self.bid_sums.add(dense, bid)
+        self.same_hand_bids.setdefault(dense, BidTree()).add(bid, 1)
+
+    def remove(self, key, bid):
+        """
+    Removes a previously inserted hand, moving every hand above it down a rank.
+
+    :param key: Packed key of the hand.
+    :param bid: Bid of the hand.
+    """
+        dense = self._dense_key(key)
+        same_hand_bids = self.same_hand_bids.get(dense)
+        if (same_hand_bids is None or bid < 0
+                or same_hand_bids.prefix(bid)[0] == same_hand_bids.prefix(bid - 1)[0]):
+            raise ValueError(f'No hand with key {key} and bid {bid}')
+
+        # The removed hand is the last of its equal (key, bid) hands
+        rank, bids_up_to = self._position(dense, bid)
+        self.total_winnings -= rank * bid + self.total_bids - bids_up_to
+        self.total_bids -= bid
+
+        self.counts.add(dense, -1)
+        self.bid_sums.add(dense, -bid)
+        same_hand_bids.add(bid, -1)
+        if not same_hand_bids.count:
+            del self.same_hand_bids[dense]
+
+
+def merge_runs(paths, chunk_rows):
+    """
+  Merges sorted spill files chunk by chunk and sums up rank times bid, entirely with array
+  operations. All buffered pairs up to the smallest last pair of a run that still has
+  unread data are final, so they are sorted together and ranked; that run's buffer is
+  always used up, and only then refilled.
+
+  :param paths: Paths of the spill files, each sorted as by sort_hands.
+  :param chunk_rows: Number of pairs read from a spill file at once.
+  :return: Total winnings of all hands in the spill files.
   """
-    return sorted(map(hand.count, hand), reverse=True)
+    total = ranked = 0
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(path, 'rb')) for path in paths]
+        buffers = [np.zeros((0, 2), dtype=np.int64) for _ in files]
+        unread = [True] * len(files)
+
+        while True:
+            for run, file in enumerate(files):
+                if unread[run] and not len(buffers[run]):
+                    buffers[run] = np.fromfile(file, dtype=np.int64, count=2 * chunk_rows).reshape(-1, 2)
+                    unread[run] = len(buffers[run]) == chunk_rows
+            if not any(len(buffer) for buffer in buffers):
+                return total
+
+            # Unread pairs of a run are never smaller than the last pair of its buffer
+            limits = [tuple(buffer[-1]) for buffer, more in zip(buffers, unread) if more]
+            if limits:
+                key, bid = min(limits)
+                final = [np.count_nonzero((keys < key) | (keys == key) & (bids <= bid))
+                         for keys, bids in (buffer.T for buffer in buffers)]
+            else:
+                final = [len(buffer) for buffer in buffers]
+
+            bids = sort_hands(np.concatenate([buffer[:count] for buffer, count in zip(buffers, final)]))[:, 1]
+            total += int((np.arange(ranked + 1, ranked + len(bids) + 1, dtype=np.int64) * bids).sum())
+            ranked += len(bids)
+            buffers = [buffer[count:] for buffer, count in zip(buffers, final)]
+
+
+def rank_hands_file(file_path, faces=('ABCDE', 'A0CDE'), memory_budget=1 << 26):
+    """
+  Calculates the total winnings for every face value set in a single read of the file.
+  Hands are buffered as compact (key, bid) pairs; whenever the buffers exceed the memory
+  budget they are sorted and spilled to temporary files, which are finally combined in
+  a streaming merge, so files larger than the available memory can be ranked.
+
+  :param file_path: Path of the file with one hand and bid per line.
+  :param faces: Face value strings, one total is calculated for each of them.
+  :param memory_budget: Approximate number of bytes used for buffered hands.
+  :return: List of total winnings, one per face value string.
+  """
+    # Every buffered hand takes a key and a bid of 8 bytes each, per face value set, and
+    # sorting a buffer for a spill takes another 24 bytes per hand for its order and copy
+    capacity = max(memory_budget // (16 * len(faces) + 24), 1)
+    buffers = [array('q') for _ in faces]
+    runs = [[] for _ in faces]
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        def spill():
+            for buffer, face_runs in zip(buffers, runs):
+                path = os.path.join(spill_dir, f'run_{len(face_runs)}_{id(face_runs)}')
+                sort_hands(np.frombuffer(buffer, dtype=np.int64).reshape(-1, 2)).tofile(path)
+                face_runs.append(path)
+                del buffer[:]
+
+        with open(file_path, 'r') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                for buffer, face in zip(buffers, faces):
+                    buffer.extend(eval_hand(line, face))
+                if len(buffers[0]) >= 2 * capacity:
+                    spill()
+
+        # Everything fitted into memory, no merge needed
+        if not runs[0]:
+            return [calculate_total_winnings(np.frombuffer(buffer, dtype=np.int64)) for buffer in buffers]
+
+        if buffers[0]:
+            spill()
+        # Runs are merged one face value set at a time; besides the chunk buffers, the
+        # merge needs about as much again for the sorted pairs, their order and the ranks
+        chunk_rows = max(memory_budget // (4 * 16 * len(runs[0])), 1)
+        return [merge_runs(face_runs, chunk_rows) for face_runs in runs]
 
 
 def main():
     """
   Main function to process the puzzle input and calculate the total score.
   """
-    total_scores = []
-    for face in ('ABCDE', 'A0CDE'):
-        # Read the file and evaluate each line
-        evaluated_hands = [eval_hand(line, face) for line in open('puzzle_input')]
-        # Sort the evaluated hands by their scores
-        evaluated_hands.sort()
-        # Calculate the total score
-        total_score = sum(rank * bid for rank, (_, _, bid) in enumerate(evaluated_hands, start=1))
-        total_scores.append(total_score)
+    # Read the file once and evaluate each line for both face value sets
+    total_scores = rank_hands_file('puzzle_input')
 
     # Print the total scores for each face value set
     for score in total_scores:
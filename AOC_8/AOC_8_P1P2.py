@@ -1,8 +1,14 @@
-from itertools import cycle
-from math import lcm
+from collections import namedtuple
+from math import gcd
+
+import numpy as np
 
 LEFT, RIGHT = 0, 1  # Constants for directions
 
+# Eventually periodic terminal visits of a walker: visits at the steps in transient_hits,
+# then at tail + offset + k * period for every offset in cycle_offsets and k >= 0
+Cycle = namedtuple('Cycle', ['tail', 'period', 'transient_hits', 'cycle_offsets'])
+
 
 def read_file(filename):
     """
@@ -36,17 +42,217 @@ def process_nodes(raw_nodes):
     return {line[:3]: (line[7:10], line[12:15]) for line in raw_nodes.splitlines()}
 
 
-def traverse(node, directions, network):
+def ends_with_z(name):
     """
-    Generator function to traverse through the network based on directions.
+    Default terminal predicate: a node is terminal if its name ends with 'Z'.
 
-    :param node: The starting node.
-    :param directions: The list of directions to follow.
-    :param network: The network of nodes.
+    :param name: Name of the node.
+    :return: True if the node is terminal.
+    """
+    return name.endswith('Z')
+
+
+class CompiledNetwork:
+    """
+    The network compiled into integer-indexed arrays, with a jump table that gives for
+    every node the node reached after one full pass over the directions and the first
+    step within that pass at which a terminal node is visited. Traversals advance a whole
+    pass at a time, so step counts in the billions stay cheap.
+    """
+
+    def __init__(self, directions, network, is_terminal=ends_with_z):
+        """
+        Compiles the network and precomputes the per-pass jump table.
+
+        :param directions: The list of directions to follow.
+        :param network: The network of nodes.
+        :param is_terminal: Predicate on node names marking the terminal nodes.
+        """
+        self.names = list(network)
+        self.index = {name: position for position, name in enumerate(self.names)}
+        self.directions = np.array(directions, dtype=np.intp)
+        # moves[direction, node] is the node reached from node in that direction
+        self.moves = np.array([[self.index[adjacent[direction]] for adjacent in network.values()]
+                               for direction in (LEFT, RIGHT)], dtype=np.intp).reshape(2, -1)
+        self.terminal = np.array([is_terminal(name) for name in self.names], dtype=bool)
+
+        # Walk all nodes through one pass at once, recording every terminal visit
+        position = np.arange(len(self.names))
+        self.pass_hits = np.zeros((len(self.directions), len(self.names)), dtype=bool)
+        for step, direction in enumerate(self.directions):
+            self.pass_hits[step] = self.terminal[position]
+            position = self.moves[direction, position]
+        self.pass_end = position
+        self.first_hit = np.where(self.pass_hits.any(axis=0), self.pass_hits.argmax(axis=0), -1)
+
+    def steps_to_terminal(self, start):
+        """
+        Counts the steps from a node until a terminal node is visited.
+
+        :param start: Name of the starting node.
+        :return: The number of steps.
+        """
+        node, passes = self.index[start], 0
+        # Without a hit, the pass endpoints repeat after at most one visit per node
+        while passes <= len(self.names):
+            if self.first_hit[node] >= 0:
+                return passes * len(self.directions) + int(self.first_hit[node])
+            node, passes = self.pass_end[node], passes + 1
+        raise ValueError(f'No terminal node is reachable from {start}')
+
+    def analyse_cycle(self, start):
+        """
+        Finds the tail, the period and the terminal visits of a walker over the combined
+        (node, instruction index) state space. The instruction index repeats with every
+        pass, so the period is a multiple of the pass length and the cycle can be found
+        on the nodes at pass boundaries.
+
+        :param start: Name of the starting node.
+        :return: The Cycle of the walker.
+        """
+        seen, order, node = {}, [], self.index[start]
+        while node not in seen:
+            seen[node] = len(order)
+            order.append(node)
+            node = self.pass_end[node]
+
+        length, tail_passes = len(self.directions), seen[node]
+        hits = [[passes * length + int(offset) for offset in np.flatnonzero(self.pass_hits[:, node])]
+                for passes, node in enumerate(order)]
+        tail = tail_passes * length
+        return Cycle(tail, (len(order) - tail_passes) * length,
+                     [step for steps in hits[:tail_passes] for step in steps],
+                     [step - tail for steps in hits[tail_passes:] for step in steps])
+
+
+class JumpTable:
+    """
+    Binary-lifting tables over the (node, instruction index) states of a compiled network.
+    Level j holds, for every state, the state reached after 2 ** j steps and the number of
+    terminal visits on the way, so the position after k steps and the visits within any
+    step range are found in O(log k), for whole batches of walkers at once. Levels are
+    built on demand up to the largest step count queried so far.
+    """
+
+    def __init__(self, compiled):
+        """
+        Builds the first level of the tables.
+
+        :param compiled: The CompiledNetwork to query.
+        """
+        self.compiled = compiled
+        length = len(compiled.directions)
+        nodes, offsets = np.divmod(np.arange(len(compiled.names) * length), length)
+
+        # State node * length + offset means standing on node before instruction offset
+        self.jumps = [(compiled.moves[compiled.directions[offsets], nodes] * length
+                       + (offsets + 1) % length).astype(np.int32)]
+        self.visits = [compiled.terminal[nodes].astype(np.int64)]
+
+    def _ensure_levels(self, steps):
+        """
+        Extends the tables until they cover the given number of steps.
+
+        :param steps: Array of step counts.
+        """
+        while steps.size and int(steps.max()) >> len(self.jumps):
+            jump, visits = self.jumps[-1], self.visits[-1]
+            self.jumps.append(jump[jump])
+            self.visits.append(visits + visits[jump])
+
+    def _walk(self, starts, steps):
+        """
+        Advances walkers from their starting nodes.
+
+        :param starts: Names of the starting nodes.
+        :param steps: Number of steps per walker.
+        :return: Tuple of the reached states and the terminal visits within [0, steps).
+        """
+        steps = np.asarray(steps, dtype=np.int64)
+        if (steps < 0).any():
+            raise ValueError('Step counts must not be negative')
+        states = np.array([self.compiled.index[start] for start in starts], dtype=np.int64)
+        states = np.broadcast_to(states * len(self.compiled.directions), steps.shape).copy()
+        counts = np.zeros(steps.shape, dtype=np.int64)
+
+        self._ensure_levels(steps)
+        for level, (jump, visits) in enumerate(zip(self.jumps, self.visits)):
+            taken = (steps >> level) & 1 == 1
+            counts[taken] += visits[states[taken]]
+            states[taken] = jump[states[taken]]
+        return states, counts
+
+    def positions(self, starts, steps):
+        """
+        Finds where walkers are after the given numbers of steps.
+
+        :param starts: Names of the starting nodes, one per query.
+        :param steps: Number of steps, one per query.
+        :return: List of node names.
+        """
+        states, _ = self._walk(starts, steps)
+        return [self.compiled.names[node] for node in states // len(self.compiled.directions)]
+
+    def terminal_visits(self, starts, first, last):
+        """
+        Counts how often walkers stand on a terminal node at the steps in [first, last).
+
+        :param starts: Names of the starting nodes, one per query.
+        :param first: Inclusive first step, one per query.
+        :param last: Exclusive last step, one per query.
+        :return: An int64 array with the number of terminal visits per query.
+        """
+        if (np.asarray(first) > np.asarray(last)).any():
+            raise ValueError('Every range must start at or before its end')
+        _, before_last = self._walk(starts, last)
+        _, before_first = self._walk(starts, first)
+        return before_last - before_first
+
+
+def combine_congruences(first, second):
+    """
+    Combines two congruences t = a (mod m) into one, with generalized CRT for non-coprime moduli.
+
+    :param first: Tuple of (residue, modulus).
+    :param second: Tuple of (residue, modulus).
+    :return: Combined (residue, modulus) tuple, or None if they are incompatible.
     """
-    for direction in cycle(directions):
-        yield node
-        node = network[node][direction]
+    (residue_1, modulus_1), (residue_2, modulus_2) = first, second
+    divisor = gcd(modulus_1, modulus_2)
+    if (residue_2 - residue_1) % divisor:
+        return None
+    reduced = modulus_2 // divisor
+    factor = (residue_2 - residue_1) // divisor * pow(modulus_1 // divisor, -1, reduced) % reduced
+    modulus = modulus_1 * reduced
+    return (residue_1 + modulus_1 * factor) % modulus, modulus
+
+
+def earliest_common_hit(cycles):
+    """
+    Finds the first step at which all walkers visit a terminal node at the same time.
+
+    :param cycles: List of Cycle tuples, one per walker.
+    :return: The earliest synchronized step, or None if there is none.
+    """
+    latest_tail = max((cycle.tail for cycle in cycles), default=0)
+
+    # Steps before every walker is on its cycle are checked directly
+    early = None
+    for cycle in cycles:
+        hits = set(cycle.transient_hits)
+        for offset in cycle.cycle_offsets:
+            hits.update(range(cycle.tail + offset, latest_tail, cycle.period))
+        early = hits if early is None else early & hits
+    if early:
+        return min(early)
+
+    # Afterwards every walker contributes one congruence per terminal visit on its cycle
+    solutions = {(0, 1)}
+    for cycle in cycles:
+        congruences = {((cycle.tail + offset) % cycle.period, cycle.period) for offset in cycle.cycle_offsets}
+        solutions = {combined for solution in solutions for congruence in congruences
+                     if (combined := combine_congruences(solution, congruence))}
+    return min((latest_tail + (residue - latest_tail) % modulus for residue, modulus in solutions), default=None)
 
 
 def task_1(directions, network):
@@ -57,20 +263,19 @@ def task_1(directions, network):
     :param network: The network of nodes.
     :return: The number of steps to reach 'ZZZ' from 'AAA'.
     """
-    return next(step for step, position in enumerate(traverse('AAA', directions, network)) if position == 'ZZZ')
+    return CompiledNetwork(directions, network, lambda name: name == 'ZZZ').steps_to_terminal('AAA')
 
 
 def task_2(directions, network):
     """
-    Solves Task 2 by calculating the least common multiple of steps needed to reach nodes ending with 'Z' from nodes ending with 'A'.
+    Solves Task 2 by finding the first step at which the walkers from all nodes ending with 'A' are on nodes ending with 'Z' at once.
 
     :param directions: The list of directions to follow.
     :param network: The network of nodes.
-    :return: The least common multiple of the required steps.
+    :return: The number of steps until all walkers are synchronized.
     """
-    steps = [next(step for step, position in enumerate(traverse(start, directions, network)) if position.endswith('Z'))
-             for start in (key for key in network if key.endswith('A'))]
-    return lcm(*steps)
+    compiled = CompiledNetwork(directions, network)
+    return earliest_common_hit([compiled.analyse_cycle(start) for start in network if start.endswith('A')])
 
 
 if __name__ == '__main__':
@@ -1,4 +1,12 @@
 import itertools
+from collections import defaultdict
+from functools import lru_cache
+from math import comb
+
+import numpy as np
+
+# Largest absolute value of a weighted sum that is computed in int64
+INT64_LIMIT = 2 ** 63 - 1
 
 def read_sequences(file_path):
     """
@@ -11,28 +19,6 @@ def read_sequences(file_path):
         data = file.readlines()
     return [[int(item) for item in line.strip().split()] for line in data]
 
-def next_sequence(seq):
-    """
-    Generates the next sequence by subtracting each pair of consecutive numbers.
-
-    :param seq: The current sequence as a list of integers.
-    :return: The next sequence obtained by subtracting consecutive pairs.
-    """
-    return [y - x for x, y in itertools.pairwise(seq)]
-
-def calculate_extrapolation(seq):
-    """
-    Calculates the extrapolation of a sequence.
-
-    :param seq: The initial sequence as a list of integers.
-    :return: The extrapolated result as an integer.
-    """
-    result = seq[-1]  # Initialize with the last element of the sequence
-    while any(num != 0 for num in seq):  # Continue until all elements are zero
-        seq = next_sequence(seq)
-        result += seq[-1]  # Add the last element of the new sequence
-    return result
-
 def pairwise(iterable):
     """
     Custom implementation of itertools.pairwise for Python versions earlier than 3.10.
@@ -54,6 +40,19 @@ def next_sequence(seq):
     """
     return [y - x for x, y in pairwise(seq)]
 
+def calculate_extrapolation(seq):
+    """
+    Calculates the extrapolation of a sequence.
+
+    :param seq: The initial sequence as a list of integers.
+    :return: The extrapolated result as an integer.
+    """
+    result = seq[-1]  # Initialize with the last element of the sequence
+    while any(num != 0 for num in seq):  # Continue until all elements are zero
+        seq = next_sequence(seq)
+        result += seq[-1]  # Add the last element of the new sequence
+    return result
+
 def process_sequences(sequences, reverse=False):
     """
     Processes a list of sequences and calculates their total extrapolation.
@@ -69,13 +68,144 @@ def process_sequences(sequences, reverse=False):
         total += calculate_extrapolation(sequence)
     return total
 
+@lru_cache(maxsize=None)
+def binomial_weights(length):
+    """
+    Calculates the weights that extrapolate a sequence of the given length in both
+    directions. Extending the difference table by one column is a fixed signed-binomial
+    sum of the inputs: next = sum((-1) ** (n - 1 - i) * C(n, i) * x_i) and
+    previous = sum((-1) ** i * C(n, i + 1) * x_i).
+
+    :param length: Length n of the sequences.
+    :return: Tuple of the next-value weights and the previous-value weights.
+    """
+    next_weights = tuple((-1) ** (length - 1 - i) * comb(length, i) for i in range(length))
+    previous_weights = tuple((-1) ** i * comb(length, i + 1) for i in range(length))
+    return next_weights, previous_weights
+
+def process_sequences_vectorized(sequences):
+    """
+    Calculates the total extrapolation of all sequences in both directions at once.
+    Sequences of equal length are stacked into a matrix and extrapolated with two
+    matrix-vector products; groups that could overflow int64 use exact Python integers.
+
+    :param sequences: List of integer sequences.
+    :return: Tuple of the total next-value and the total previous-value extrapolation.
+    """
+    groups = defaultdict(list)
+    for sequence in sequences:
+        groups[len(sequence)].append(sequence)
+
+    total_next = total_previous = 0
+    for length, group in groups.items():
+        next_weights, previous_weights = binomial_weights(length)
+        largest = max((abs(value) for sequence in group for value in sequence), default=0)
+
+        # The weights of each direction sum up to 2 ** length - 1 in absolute value,
+        # and the weights themselves must fit as well, even for all-zero sequences
+        if max(largest, 1) * 2 ** length * len(group) <= INT64_LIMIT:
+            matrix = np.array(group, dtype=np.int64)
+            total_next += int((matrix @ np.array(next_weights, dtype=np.int64)).sum())
+            total_previous += int((matrix @ np.array(previous_weights, dtype=np.int64)).sum())
+        else:
+            for sequence in group:
+                total_next += sum(weight * value for weight, value in zip(next_weights, sequence))
+                total_previous += sum(weight * value for weight, value in zip(previous_weights, sequence))
+
+    return total_next, total_previous
+
+class SensorHistory:
+    """
+    Online extrapolator for a single sensor. Only the right edge of the difference table
+    is kept, i.e. the last value of each difference level up to the given degree; higher
+    differences are assumed to be zero. Appending a reading and predicting the next one
+    both take O(degree), regardless of how long the history is.
+    """
+
+    def __init__(self, degree):
+        """
+        Creates an extrapolator without readings.
+
+        :param degree: Highest difference level kept, the degree of the fitted polynomial.
+        """
+        self.degree = degree
+        self.edge = []
+
+    def append(self, value):
+        """
+        Adds a reading, updating the right edge of every difference level.
+
+        :param value: The new reading.
+        """
+        edge = [value]
+        for previous in self.edge[:self.degree]:
+            edge.append(edge[-1] - previous)
+        self.edge = edge
+
+    def predict(self):
+        """
+        Predicts the next reading, the sum of the right edge of the difference table.
+
+        :return: The extrapolated next value.
+        """
+        return sum(self.edge)
+
+class SensorBank:
+    """
+    Online extrapolators for many sensors at once, kept as one int64 array holding the
+    right edge of every sensor's difference table.
+    """
+
+    def __init__(self, sensors, degree):
+        """
+        Creates extrapolators without readings.
+
+        :param sensors: Number of sensors.
+        :param degree: Highest difference level kept, the degree of the fitted polynomial.
+        """
+        self.edges = np.zeros((sensors, degree + 1), dtype=np.int64)
+        self.readings = np.zeros(sensors, dtype=np.int64)
+
+    def append(self, sensor_ids, values):
+        """
+        Adds one reading to each of the given sensors.
+
+        :param sensor_ids: Array of distinct sensor indices.
+        :param values: Array of readings, one per sensor index.
+        """
+        sensor_ids = np.asarray(sensor_ids, dtype=np.intp)
+        if np.unique(sensor_ids).size != sensor_ids.size:
+            raise ValueError('Every sensor can only receive one reading per append')
+
+        old = self.edges[sensor_ids]
+        new = np.zeros_like(old)
+        new[:, 0] = values
+        readings = self.readings[sensor_ids]
+        for level in range(1, old.shape[1]):
+            # Level k exists once a sensor has more than k readings
+            new[:, level] = np.where(readings >= level, new[:, level - 1] - old[:, level - 1], 0)
+
+        self.edges[sensor_ids] = new
+        self.readings[sensor_ids] += 1
+
+    def predict(self, sensor_ids=None):
+        """
+        Predicts the next reading of the given sensors.
+
+        :param sensor_ids: Array of sensor indices, all sensors if None.
+        :return: An int64 array of extrapolated next values.
+        """
+        edges = self.edges if sensor_ids is None else self.edges[np.asarray(sensor_ids, dtype=np.intp)]
+        return edges.sum(axis=1)
+
 def main():
     """
     Main function to execute the script.
     """
     sequence_data = read_sequences('puzzle_input')
-    print(f'Result for Part 1: {process_sequences(sequence_data)}')
-    print(f'Result for Part 2: {process_sequences(sequence_data, reverse=True)}')
+    part_1, part_2 = process_sequences_vectorized(sequence_data)
+    print(f'Result for Part 1: {part_1}')
+    print(f'Result for Part 2: {part_2}')
 
 if __name__ == "__main__":
     main()